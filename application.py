@@ -4,9 +4,11 @@ from dash.dependencies import Input, Output, State
 import dash_bootstrap_components as dbc
 import polars as pl
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from dash.exceptions import PreventUpdate
 from functools import lru_cache
+from itertools import cycle
 
 # Import data loading functions
 from src.data_loader import load_players, load_rankings, load_tournaments
@@ -32,36 +34,89 @@ except FileNotFoundError:
     players_df = pl.DataFrame(schema={"atp_id": pl.Utf8, "full_name": pl.Utf8, "country_code": pl.Utf8, "dob": pl.Date})
 
 print("Loading rankings data...")
-rankings_df = load_rankings()
+rankings_df = load_rankings(columns=("atp_id", "atp_name", "ranking_date", "rank"))
 
 print("Loading tournaments data...")
-tournaments_df = load_tournaments()
+# Only the columns used for the tournament win markers
+tournaments_df = load_tournaments(
+    columns=("tournament_name", "end_date", "tournament_type", "singles_winner_urls", "venue")
+)
+
+# Map atp_id -> player row once, so lookups are dict probes instead of DataFrame scans
+def index_players_by_id(players_df):
+    return {
+        row["atp_id"]: row
+        for row in players_df.unique("atp_id", keep="first", maintain_order=True).iter_rows(named=True)
+    }
+
+player_info_by_id = index_players_by_id(players_df)
+
+# Known birth dates as datetime64[D], converted once for all players instead of per callback
+known_dobs = players_df.unique("atp_id", keep="first", maintain_order=True).filter(pl.col("dob").is_not_null())
+birth_days_by_id = dict(zip(
+    known_dobs.get_column("atp_id").to_list(),
+    known_dobs.get_column("dob").cast(pl.Date).to_numpy()
+))
+
+# Age (in years) at each ranking date, computed once for all players so age plots need no date math
+rankings_df = rankings_df.join(
+    players_df.select("atp_id", "dob").unique("atp_id", keep="first"), on="atp_id", how="left"
+).with_columns(
+    ((pl.col("ranking_date").cast(pl.Date) - pl.col("dob").cast(pl.Date)).dt.total_days()
+     / 365.25).cast(pl.Float32).alias("age_years")
+).drop("dob").sort(["atp_id", "ranking_date"])
+
+# Rankings are sorted by player and date once, so each player's history is a contiguous
+# block: map atp_id -> (offset, length) and take zero-copy slices instead of filtering
+ranking_offsets = {
+    atp_id: (offset, length)
+    for atp_id, offset, length in rankings_df.with_row_index("offset").group_by("atp_id").agg(
+        pl.col("offset").first(), pl.len()
+    ).iter_rows()
+}
+
+# Display name of a player, cached across callbacks since the same players are plotted repeatedly
+@lru_cache(maxsize=4096)
+def resolve_player_name(atp_id):
+    player_info = player_info_by_id.get(atp_id)
+    if player_info is not None:
+        return player_info.get('full_name', '') or f"{player_info.get('first_name', '')} {player_info.get('last_name', '')}".strip()
+    
+    # Fallback to atp_name from rankings
+    offset = ranking_offsets.get(atp_id)
+    if offset is not None:
+        return rankings_df.get_column("atp_name")[offset[0]].replace('-', ' ').title()
+    
+    return f"Player {atp_id}"
 
 # Create a function to generate player options once
 def generate_player_options(players_df, rankings_df):
     options = []
     
-    # Get all known atp_ids from players_df
-    known_atp_ids = set(players_df.get_column("atp_id").unique()) if not players_df.is_empty() else set()
+    # Index the known players by atp_id
+    players_by_id = index_players_by_id(players_df)
     
     # Process all players from rankings_df
     if not rankings_df.is_empty():
-        # Get unique players from rankings
-        unique_players = rankings_df.select(["atp_id", "atp_name"]).unique()
+        # Get unique players from rankings, normalizing all search names in one vectorized pass
+        unique_players = rankings_df.select(["atp_id", "atp_name"]).unique().with_columns(
+            pl.col("atp_name").str.replace_all("-", " ", literal=True).str.to_lowercase().alias("search_name")
+        )
         
         for row in unique_players.iter_rows(named=True):
             atp_id = row["atp_id"]
             atp_name = row["atp_name"]
+            search_name = row["search_name"]
             search_terms = []
             
-            if atp_name is not None and not pd.isna(atp_name):
-                search_terms = [atp_name.replace('-', ' ').lower()]
+            if search_name is not None:
+                search_terms = [search_name]
             else:
                 search_terms = []
             
             # If player exists in players_df, use that data
-            if atp_id in known_atp_ids:
-                player_info = players_df.filter(pl.col("atp_id") == atp_id).row(0, named=True)
+            player_info = players_by_id.get(atp_id)
+            if player_info is not None:
                 
                 # Use full_name if available, otherwise use atp_name
                 full_name = player_info.get('full_name', '')
@@ -94,7 +149,7 @@ def generate_player_options(players_df, rankings_df):
                 
                 # Use atp_name as display name (with dashes replaced by spaces)
                 display_name = atp_name.replace('-', ' ').title()
-                search_terms.append(atp_name.replace('-', ' ').lower())
+                search_terms.append(search_name)
             
             options.append({
                 'label': display_name,
@@ -106,79 +161,82 @@ def generate_player_options(players_df, rankings_df):
     options.sort(key=lambda x: x['label'])
     return options
 
-# Generate options once at startup
-player_options = generate_player_options(players_df, rankings_df)
-
-# After loading data, create a search index
-player_search_index = {}
+# Create a function to build the search index once
+def build_player_search_index(players_df, rankings_df):
+    player_search_index = {}
+
+    # First try using players_df
+    if not players_df.is_empty():
+        # Normalize names and country codes with vectorized string kernels
+        normalized_players = players_df.select(
+            pl.col("atp_id"),
+            pl.col("full_name").cast(pl.Utf8).fill_null("").str.to_lowercase().alias("full_name"),
+            (pl.col("country_code").cast(pl.Utf8).str.to_lowercase() if "country_code" in players_df.columns
+             else pl.lit(None, dtype=pl.Utf8)).alias("country_code")
+        )
 
-# First try using players_df
-if not players_df.is_empty():
-    for row in players_df.iter_rows(named=True):
-        atp_id = row['atp_id']
-        full_name = "" if pd.isna(row.get('full_name', '')) else str(row.get('full_name', '')).lower()
+        for atp_id, full_name, country_code in normalized_players.iter_rows():
+            # Skip players with empty names
+            if not full_name:
+                continue
         
-        # Skip players with empty names
-        if not full_name:
-            continue
+            # Add to search index with all possible search terms
+            search_terms = []
         
-        # Add to search index with all possible search terms
-        search_terms = []
+            # Add full name
+            search_terms.append(full_name)
+        
+            # Add each word in the name separately for partial matching
+            name_parts = full_name.split()
+            for part in name_parts:
+                if len(part) > 1:  # Skip very short parts
+                    search_terms.append(part)
         
-        # Add full name
-        search_terms.append(full_name)
+            # Add country code if available
+            if country_code:
+                search_terms.append(country_code)
         
-        # Add each word in the name separately for partial matching
-        name_parts = full_name.split()
+            # Add to search index with all possible search terms
+            for term in search_terms:
+                if term:
+                    if term not in player_search_index:
+                        player_search_index[term] = []
+                    player_search_index[term].append(atp_id)
+
+    # Process rankings_df for players not in players_df, normalizing atp_name in one vectorized pass
+    unique_players = (
+        rankings_df.select(["atp_id", "atp_name"]).unique()
+        .filter(pl.col("atp_name").is_not_null() & (pl.col("atp_name") != ""))
+        .with_columns(pl.col("atp_name").str.replace_all("-", " ", literal=True).str.to_lowercase().alias("search_name"))
+    )
+    for atp_id, search_name in unique_players.select(["atp_id", "search_name"]).iter_rows():
+        # Skip players we already processed from players_df
+        if atp_id in player_search_index.get('atp_id', []):
+            continue
+    
+        # Add to search index
+        search_terms = []
+        search_terms.append(search_name)
+    
+        # Add each word in the name separately
+        name_parts = search_name.split()
         for part in name_parts:
             if len(part) > 1:  # Skip very short parts
                 search_terms.append(part)
-        
-        # Add country code if available
-        country_code = row.get('country_code', '')
-        if country_code and not pd.isna(country_code):
-            country_code = country_code.lower()
-            search_terms.append(country_code)
-        
-        # Add to search index with all possible search terms
+    
+        # Add to search index
         for term in search_terms:
             if term:
                 if term not in player_search_index:
                     player_search_index[term] = []
                 player_search_index[term].append(atp_id)
 
-# Process rankings_df for players not in players_df
-unique_players = rankings_df.select(["atp_id", "atp_name"]).unique()
-for row in unique_players.iter_rows(named=True):
-    atp_id = row['atp_id']
-    
-    # Skip players we already processed from players_df
-    if atp_id in player_search_index.get('atp_id', []):
-        continue
-    
-    atp_name = row['atp_name']
-    if not atp_name or pd.isna(atp_name):
-        continue
-    
-    # Format atp_name for search
-    search_name = atp_name.replace('-', ' ').lower()
-    
-    # Add to search index
-    search_terms = []
-    search_terms.append(search_name)
-    
-    # Add each word in the name separately
-    name_parts = search_name.split()
-    for part in name_parts:
-        if len(part) > 1:  # Skip very short parts
-            search_terms.append(part)
-    
-    # Add to search index
-    for term in search_terms:
-        if term:
-            if term not in player_search_index:
-                player_search_index[term] = []
-            player_search_index[term].append(atp_id)
+    return player_search_index
+
+
+# Generate options and search index once at startup
+player_options = generate_player_options(players_df, rankings_df)
+player_search_index = build_player_search_index(players_df, rankings_df)
 
 
 # Add a cached search function
@@ -189,45 +247,42 @@ def search_players(query):
 
     # Split the query into parts to handle multi-word searches better
     query_parts = query.split()
-
-    # Try exact matches but don't return immediately
+    long_parts = [part for part in query_parts if len(part) >= 3] if len(query_parts) > 1 else []
+
+    # Partial matching for longer queries uses the first 70% of the query;
+    # a partial query containing a space can never match within a single word
+    partial_query = query[:int(len(query)*0.7)] if len(query) >= 3 else None
+    if partial_query is not None and ' ' in partial_query:
+        partial_query = None
+
+    # A term shorter than every needle cannot contain any of them, so reject it
+    # on length alone before doing any substring work
+    needle_lengths = [len(partial_query or query)] + [len(part) for part in long_parts]
+    min_term_length = min(needle_lengths)
+
+    # Single pass over the index: exact, starts-with and contains matches are all
+    # covered by the substring test, and word-part counts are gathered alongside
+    potential_matches = {}
     for term, ids in player_search_index.items():
-        if query == term:
-            matching_ids.update(ids)
+        if len(term) < min_term_length:
+            continue
 
-    # Try starts-with matches and add to results
-    for term, ids in player_search_index.items():
-        if term.startswith(query):
+        if query in term or (partial_query and partial_query in term):
             matching_ids.update(ids)
-    
-    # Try matching individual parts
-    if len(query_parts) > 1:
+
         # For multi-word queries, try to match each part
-        potential_matches = {}
-        for part in query_parts:
-            if len(part) < 3:  # Skip very short parts
-                continue
-            for term, ids in player_search_index.items():
-                if part in term.split():
+        if long_parts:
+            term_words = term.split()
+            for part in long_parts:
+                if part in term_words:
                     for atp_id in ids:
                         potential_matches[atp_id] = potential_matches.get(atp_id, 0) + 1
 
-        # Find players that match multiple parts of the query
-        for atp_id, match_count in potential_matches.items():
-            if match_count >= min(2, len(query_parts)):
-                matching_ids.add(atp_id)
-        
-    # Try contains matching
-    for term, ids in player_search_index.items():
-        if query in term:
-            matching_ids.update(ids)
-    
-    # Try partial matching for longer queries
-    if len(query) >= 3:
-        for term, ids in player_search_index.items():
-            if any(query[:int(len(query)*0.7)] in word for word in term.split()):
-                matching_ids.update(ids)
-    
+    # Find players that match multiple parts of the query
+    for atp_id, match_count in potential_matches.items():
+        if match_count >= min(2, len(query_parts)):
+            matching_ids.add(atp_id)
+
     return matching_ids
 
 # App layout
@@ -324,6 +379,86 @@ app.layout = html.Div([
 ], className="container")
 
 
+# Colors for different players
+PLAYER_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+# Tournament type code -> hover label and win marker size
+TOURNAMENT_TYPE_LABELS = {'gs': 'Grand Slam', 'atp': 'ATP Tour', 'ch': 'Challenger Tour', 'fu': 'ITF Tour'}
+TOURNAMENT_MARKER_SIZES = {'gs': 12, 'atp': 10, 'ch': 8, 'fu': 6}
+
+# Static figure styling, built once instead of on every callback
+AGE_XAXIS_STYLE = dict(
+    title=dict(text='Age (years)', font=dict(size=14, color='#444')),
+    tickformat='.1f',
+    gridcolor='rgba(0,0,0,0.1)',
+    zeroline=True,
+    zerolinecolor='rgba(0,0,0,0.2)'
+)
+DATE_XAXIS_STYLE = dict(
+    title=dict(text='Date', font=dict(size=14, color='#444')),
+    hoverformat='%b %d, %Y',
+    gridcolor='rgba(0,0,0,0.1)',
+    zeroline=True,
+    zerolinecolor='rgba(0,0,0,0.2)',
+    rangeselector=dict(
+        buttons=list([
+            dict(count=1, label="1m", step="month", stepmode="backward"),
+            dict(count=6, label="6m", step="month", stepmode="backward"),
+            dict(count=1, label="YTD", step="year", stepmode="todate"),
+            dict(count=1, label="1y", step="year", stepmode="backward"),
+            dict(count=3, label="3y", step="year", stepmode="backward"),
+            dict(step="all")
+        ])
+    )
+)
+BASE_LAYOUT = dict(
+    yaxis=dict(
+        title=dict(text='ATP Ranking', font=dict(size=14, color='#444')),
+        autorange='reversed',
+        gridcolor='rgba(0,0,0,0.1)',
+        zeroline=False
+    ),
+    plot_bgcolor='#ffffff',
+    paper_bgcolor='#ffffff',
+    hovermode='x',
+    showlegend=False,
+    margin=dict(l=10, r=10, t=30, b=20),
+    font=dict(family="Segoe UI, Arial, sans-serif")
+)
+WATERMARK = dict(
+    text="TennisRank.net",
+    xref="paper", yref="paper",
+    x=0.99, y=0.01,
+    showarrow=False,
+    font=dict(size=16, color="lightgrey"),
+    opacity=0.7,
+    align="right"
+)
+
+
+# Empty figure showing only a centered message
+def create_message_figure(text, color):
+    fig = go.Figure()
+    fig.add_annotation(
+        text=text,
+        xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False,
+        font=dict(size=16, color=color)
+    )
+    # Hide axis values and grid lines
+    fig.update_xaxes(showticklabels=False, showgrid=False, zeroline=False)
+    fig.update_yaxes(showticklabels=False, showgrid=False, zeroline=False)
+    return fig
+
+# Placeholder figures never change, so they are built once and returned as-is (never mutated)
+NO_SELECTION_FIGURE = create_message_figure(
+    "Select players from the dropdown above<br>to visualize their ranking history", "#666666"
+)
+NO_BIRTH_DATES_FIGURE = create_message_figure(
+    "Cannot display age-based plot:<br>birth date information is missing<br>for selected player(s)", "#bb2222"
+)
+NO_BIRTH_DATES_FIGURE.add_annotation(WATERMARK)
+
+
 @app.callback(
     Output('rankings-graph', 'figure'),
     [Input('player-dropdown', 'value'),
@@ -333,123 +468,71 @@ app.layout = html.Div([
 def update_graph(selected_atp_ids, x_axis_type, tournament_types):
     # Handle no selection
     if not selected_atp_ids:
-        # Create empty figure with message
-        fig = go.Figure()
-        fig.add_annotation(
-            text="Select players from the dropdown above<br>to visualize their ranking history",
-            xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#666666")
-        )
-        # Hide axis values and grid lines
-        fig.update_xaxes(showticklabels=False, showgrid=False, zeroline=False)
-        fig.update_yaxes(showticklabels=False, showgrid=False, zeroline=False)
-        return fig
+        return NO_SELECTION_FIGURE
     
     # Create figure
     fig = go.Figure()
     
-    # Colors for different players
-    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
-
-    # Pre-fetch all player info at once
-    player_info_dict = {}
-    for atp_id in selected_atp_ids:
-        player_info = players_df.filter(pl.col("atp_id") == atp_id)
-        if not player_info.is_empty():
-            player_info_dict[atp_id] = player_info.row(0, named=True)
-    
     messages = []
-    all_x_values = []  # To store all x values for padding calculation
+    x_min = x_max = None  # Running x range over all players, for the padding calculation
 
-    for i, atp_id in enumerate(selected_atp_ids):
-        # Filter rankings for this player
-        player_data = rankings_df.filter(pl.col("atp_id") == atp_id)
+    # Each player's color comes from cycling the palette, instead of modulo indexing at every use
+    for atp_id, color in zip(selected_atp_ids, cycle(PLAYER_COLORS)):
+        # This player's rankings, a slice of the presorted frame
+        offset = ranking_offsets.get(atp_id)
+        player_data = rankings_df.slice(*offset) if offset is not None else None
         
-        if player_data.is_empty():
-            # Get player name from pre-fetched info
-            player_info = player_info_dict.get(atp_id)
-            if player_info is not None:
-                player_name = player_info.get('full_name', '') or f"{player_info.get('first_name', '')} {player_info.get('last_name', '')}".strip()
-            else:
-                player_name = f"Player {atp_id}"
-            
+        # Get player name
+        player_name = resolve_player_name(atp_id)
+        
+        if player_data is None:
             messages.append(f"No ranking data found for {player_name}")
             continue
 
-        # Sort by date
-        player_data = player_data.sort("ranking_date")
-
-        # Get player name
-        player_info = player_info_dict.get(atp_id)
-        if player_info is not None:
-            player_name = player_info.get('full_name', '')
-        else:
-            # Fallback to atp_name from rankings
-            player_row = rankings_df.filter(pl.col("atp_id") == atp_id)
-            if not player_row.is_empty():
-                atp_name = player_row.select("atp_name").row(0)[0]
-                player_name = atp_name.replace('-', ' ').title()
-            else:
-                player_name = f"Player {atp_id}"
-
-        # For plotting, convert to pandas
-        player_data_pd = player_data.to_pandas()
-            
         if x_axis_type == 'age':
-            # Check if we have player info and birth date
-            if player_info is not None and 'dob' in player_info and not pd.isna(player_info['dob']):
-                birth_date = pd.to_datetime(player_info['dob'])
-                
-                # Vectorized age calculation - more efficient
-                player_data_pd['age'] = (player_data_pd['ranking_date'] - birth_date).dt.days / 365.25
-                
-                x_values = player_data_pd['age']
-                all_x_values.extend(x_values)
-                
-                # Plot with age on x-axis
-                fig.add_trace(go.Scatter(
-                    x=x_values,
-                    y=player_data_pd['rank'],
-                    mode='lines',
-                    name=player_name,
-                    line=dict(color=colors[i % len(colors)], width=2.5, shape='linear'),
-                    hovertemplate='%{fullData.name}<br>Rank: %{y}<extra></extra>',
-                    connectgaps=False
-                ))
-            else:
+            # Check if we have a birth date
+            if atp_id not in birth_days_by_id:
                 messages.append(f"Birth date not available for {player_name}, skipping age-based plot")
                 continue
-        else:
-            x_values = player_data_pd['ranking_date']
-            all_x_values.extend(x_values)
             
+            # Plot with age on x-axis; ages were precomputed at startup
+            x_series = player_data.get_column('age_years')
+        else:
             # Plot with date on x-axis
-            fig.add_trace(go.Scatter(
-                x=x_values,
-                y=player_data_pd['rank'],
-                mode='lines',
-                name=player_name,
-                line=dict(color=colors[i % len(colors)], width=2.5, shape='linear'),
-                hovertemplate='%{fullData.name}<br>Rank: %{y}<extra></extra>',
-                connectgaps=False
-            ))
+            x_series = player_data.get_column('ranking_date')
+        
+        # Plot straight from the slice's columns as NumPy arrays, with no pandas copy of the
+        # player's frame (ranks with NaN gap rows come back as floats)
+        ranks = player_data.get_column('rank')
+        rank_values = ranks.to_numpy()
+        fig.add_trace(go.Scatter(
+            x=x_series.to_numpy(),
+            y=rank_values,
+            mode='lines',
+            name=player_name,
+            line=dict(color=color, width=2.5, shape='linear'),
+            hovertemplate='%{fullData.name}<br>Rank: %{y}<extra></extra>',
+            connectgaps=False
+        ))
+
+        # Combine this player's x range with the running one (two scalars instead of all values);
+        # the history is sorted by date, and age grows with date, so the range is the endpoints
+        player_x_min, player_x_max = x_series[0], x_series[-1]
+        x_min = player_x_min if x_min is None else min(x_min, player_x_min)
+        x_max = player_x_max if x_max is None else max(x_max, player_x_max)
 
         # Add best rank marker
-        if not player_data_pd['rank'].isnull().all():
-            best_rank = player_data_pd['rank'].min()
-            
+        if ranks.null_count() < len(ranks):
             # Get the first occurrence of the best rank
-            best_row = player_data_pd[player_data_pd['rank'] == best_rank].iloc[0]
+            best_index = ranks.arg_min()
+            best_x = x_series[best_index]
+            best_y = ranks[best_index]
             
             if x_axis_type == 'age':
-                best_x = best_row['age']
                 best_x_label = f"{best_x:.2f}"
             else:
-                best_x = best_row['ranking_date']
                 best_x_label = best_x.strftime('%b %d, %Y')
             
-            best_y = best_row['rank']
-            
             # Add a marker for the first time the best rank was reached
             fig.add_trace(go.Scatter(
                 x=[best_x],
@@ -458,13 +541,13 @@ def update_graph(selected_atp_ids, x_axis_type, tournament_types):
                 marker=dict(
                     size=10,
                     symbol='star',
-                    color=colors[i % len(colors)],
+                    color=color,
                     line=dict(width=2, color='black')
                 ),
                 text=[f"#{int(best_y)}"],
                 textposition="top center",
                 textfont=dict(
-                    color=colors[i % len(colors)],
+                    color=color,
                     size=10,
                     family="Arial"
                 ),
@@ -476,15 +559,25 @@ def update_graph(selected_atp_ids, x_axis_type, tournament_types):
 
         # Tournament win markers
         if not tournaments_df.is_empty():
+            # Player's sorted history as arrays, shared by all marker lookups below
+            rank_dates = player_data['ranking_date'].to_numpy()
+            
+            # Birth date as a day count, so win ages are plain integer differences
+            birth_day = birth_days_by_id.get(atp_id)
+            
             # Convert to pandas for easier processing
             tournaments_pd = tournaments_df.to_pandas()
             
+            # Collect all of this player's win markers, then add them as a single trace
+            win_xs, win_ys, win_sizes, win_texts = [], [], [], []
+            
             # Find tournaments this player won (singles)
             for _, win in tournaments_pd.iterrows():
                 if win.get('tournament_type', '') in tournament_types:
                     # Check if this player won by matching atp_id in URLs
-                    winner_urls = win.get('singles_winner_urls', [])
-                    if isinstance(winner_urls, list) and any(atp_id in url for url in winner_urls):
+                    # List columns come back from Polars as NumPy arrays
+                    winner_urls = win.get('singles_winner_urls')
+                    if isinstance(winner_urls, (list, np.ndarray)) and any(atp_id in url for url in winner_urls):
                         # Use end date for x-axis, or skip if missing
                         end_date = win.get('end_date')
                         if pd.isnull(end_date):
@@ -495,156 +588,81 @@ def update_graph(selected_atp_ids, x_axis_type, tournament_types):
                         venue = win.get('venue', '')
                         
                         # Map type code to label and marker size
-                        type_map = {'gs': 'Grand Slam', 'atp': 'ATP Tour', 'ch': 'Challenger Tour', 'fu': 'ITF Tour'}
-                        marker_map = {'gs': 12, 'atp': 10, 'ch': 8, 'fu': 6}
-                        
-                        ttype = type_map.get(win.get('tournament_type', ''), win.get('tournament_type', ''))
-                        marker_size = marker_map.get(win.get('tournament_type', ''), 10)
+                        ttype = TOURNAMENT_TYPE_LABELS.get(win.get('tournament_type', ''), win.get('tournament_type', ''))
+                        marker_size = TOURNAMENT_MARKER_SIZES.get(win.get('tournament_type', ''), 10)
                         
                         # X-axis value depends on plot type
                         if x_axis_type == 'age':
                             # For age plots, we need birth date
-                            birth_date = None
-                            if player_info is not None and 'dob' in player_info and not pd.isna(player_info['dob']):
-                                birth_date = pd.to_datetime(player_info['dob'])
-                            
-                            if birth_date is None:
+                            if birth_day is None:
                                 # Skip this tournament for age plots if no birth date
                                 continue
                             
-                            win_age = (pd.to_datetime(end_date) - birth_date).days / 365.25
+                            win_age = (np.datetime64(end_date, 'D') - birth_day).astype(np.int64) / 365.25
                             win_x = win_age
                         else:
                             # For date plots, we don't need birth date
                             win_x = pd.to_datetime(end_date)
                         
                         # Y value: get player's rank at that date (or nearest previous date)
-                        tournament_end_date = pd.to_datetime(end_date)
+                        tournament_end_date = np.datetime64(pd.to_datetime(end_date)).astype(rank_dates.dtype)
                         
-                        # Convert to pandas for interpolation
-                        player_data_pd = player_data.to_pandas()
-                        
-                        if tournament_end_date <= player_data_pd['ranking_date'].max() and tournament_end_date >= player_data_pd['ranking_date'].min():
-                            win_y = interpolate_rank_at_date(player_data, tournament_end_date)
+                        if rank_dates[0] <= tournament_end_date <= rank_dates[-1]:
+                            win_y = interpolate_rank_at_date(rank_dates, rank_values, tournament_end_date)
                         else:
-                            # Fallback to nearest rank if outside ranking date range
-                            rank_row = player_data_pd[player_data_pd['ranking_date'] <= tournament_end_date].tail(1)
-                            win_y = rank_row['rank'].values[0] if not rank_row.empty else None
+                            # Fallback to nearest previous rank if outside ranking date range
+                            idx = np.searchsorted(rank_dates, tournament_end_date, side='right')
+                            win_y = rank_values[idx - 1] if idx > 0 else None
                         
                         if win_y is None or pd.isnull(win_y):
                             continue
                         
                         # Add marker
-                        fig.add_trace(go.Scatter(
-                            x=[win_x],
-                            y=[win_y],
-                            mode='markers',
-                            marker=dict(
-                                size=marker_size,
-                                symbol='diamond',
-                                color=colors[i % len(colors)],
-                                line=dict(width=2, color='black')
-                            ),
-                            name=f"{player_name} Tournament Win",
-                            showlegend=False,
-                            hovertemplate=(
-                                f"{tournament_name}<br>" +
-                                f"Venue: {venue}<br>" +
-                                f"Type: {ttype}<br>" +
-                                f"{'Age' if x_axis_type == 'age' else 'Date'}: %{{x}}<br><extra></extra>"
-                            ),
-                            cliponaxis=False
-                        ))
-    
-    # Set up layout
-    if x_axis_type == 'age':
-        x_axis_title = 'Age (years)'
-        
-        # Add padding to age axis if we have data
-        if all_x_values:
-            min_x = min(all_x_values)
-            max_x = max(all_x_values)
-            padding = (max_x - min_x) * 0.01  # 1% padding
-            fig.update_xaxes(
-                range=[min_x - padding, max_x + padding]  # Add padding
-            )
-        
-        fig.update_xaxes(
-            title=dict(text=x_axis_title, font=dict(size=14, color='#444')),
-            tickformat='.1f',
-            gridcolor='rgba(0,0,0,0.1)',
-            zeroline=True,
-            zerolinecolor='rgba(0,0,0,0.2)'
-        )
-    else:
-        x_axis_title = 'Date'
-        
-        # Add padding to date axis if we have data
-        if all_x_values:
-            min_date = min(all_x_values)
-            max_date = max(all_x_values)
-            date_range = max_date - min_date
-            padding = pd.Timedelta(days=int(date_range.days * 0.01))  # 1% padding
-            fig.update_xaxes(
-                range=[min_date - padding, max_date + padding]  # Add padding
-            )
-        
-        fig.update_xaxes(
-            title=dict(text=x_axis_title, font=dict(size=14, color='#444')),
-            hoverformat='%b %d, %Y',
-            gridcolor='rgba(0,0,0,0.1)',
-            zeroline=True,
-            zerolinecolor='rgba(0,0,0,0.2)',
-            rangeselector=dict(
-                buttons=list([
-                    dict(count=1, label="1m", step="month", stepmode="backward"),
-                    dict(count=6, label="6m", step="month", stepmode="backward"),
-                    dict(count=1, label="YTD", step="year", stepmode="todate"),
-                    dict(count=1, label="1y", step="year", stepmode="backward"),
-                    dict(count=3, label="3y", step="year", stepmode="backward"),
-                    dict(step="all")
-                ])
-            )
-        )
-    
-    fig.update_layout(
-        yaxis=dict(
-            title=dict(text='ATP Ranking', font=dict(size=14, color='#444')),
-            autorange='reversed',
-            gridcolor='rgba(0,0,0,0.1)',
-            zeroline=False
-        ),
-        plot_bgcolor='#ffffff',
-        paper_bgcolor='#ffffff',
-        hovermode='x',
-        showlegend=False,
-        margin=dict(l=10, r=10, t=30, b=20),
-        font=dict(family="Segoe UI, Arial, sans-serif")
-    )
+                        win_xs.append(win_x)
+                        win_ys.append(win_y)
+                        win_sizes.append(marker_size)
+                        win_texts.append(
+                            f"{tournament_name}<br>" +
+                            f"Venue: {venue}<br>" +
+                            f"Type: {ttype}"
+                        )
+            
+            if win_xs:
+                fig.add_trace(go.Scatter(
+                    x=win_xs,
+                    y=win_ys,
+                    mode='markers',
+                    marker=dict(
+                        size=win_sizes,
+                        symbol='diamond',
+                        color=color,
+                        line=dict(width=2, color='black')
+                    ),
+                    name=f"{player_name} Tournament Win",
+                    showlegend=False,
+                    text=win_texts,
+                    hovertemplate=(
+                        "%{text}<br>" +
+                        f"{'Age' if x_axis_type == 'age' else 'Date'}: %{{x}}<br><extra></extra>"
+                    ),
+                    cliponaxis=False
+                ))
     
     # If we have no traces (all players skipped due to missing birth dates)
     if x_axis_type == 'age' and not fig.data:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="Cannot display age-based plot:<br>birth date information is missing<br>for selected player(s)",
-            xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="#bb2222")
-        )
-        
-        # Hide axis values and grid lines
-        fig.update_xaxes(showticklabels=False, showgrid=False, zeroline=False)
-        fig.update_yaxes(showticklabels=False, showgrid=False, zeroline=False)
+        return NO_BIRTH_DATES_FIGURE
+    
+    # Set up layout in a single update, with 1% padding on the x axis if we have data; the
+    # range is two scalars, so the same arithmetic works for ages (floats) and dates (Timestamps)
+    xaxis = dict(AGE_XAXIS_STYLE if x_axis_type == 'age' else DATE_XAXIS_STYLE)
+    if x_min is not None:
+        padding = (x_max - x_min) * 0.01
+        xaxis['range'] = [x_min - padding, x_max + padding]  # Add padding
+    
+    fig.update_layout(BASE_LAYOUT, xaxis=xaxis)
     
     # Add a small watermark
-    fig.add_annotation(
-        text="TennisRank.net",
-        xref="paper", yref="paper",
-        x=0.99, y=0.01,
-        showarrow=False,
-        font=dict(size=16, color="lightgrey"),
-        opacity=0.7,
-        align="right"
-    )
+    fig.add_annotation(WATERMARK)
     
     return fig
 
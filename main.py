@@ -1,4 +1,5 @@
 import argparse
+import sys
 import logging
 import asyncio
 from datetime import datetime
@@ -11,6 +12,14 @@ from src.preprocess_data import preprocess_all
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Use uvloop for the player scraping event loop when available (not supported on Windows)
+if sys.platform != 'win32':
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
 
 def main():
     parser = argparse.ArgumentParser(description='ATP RankTracker')
@@ -18,6 +27,9 @@ def main():
                        help='Scrape ATP data starting from YEAR (e.g., --scrape-atp 2025)')
     parser.add_argument('--scrape-players', type=int, default=0, metavar='N',
                        help='Scrape N player details, prioritizing higher-ranked recent players')
+    parser.add_argument('--force', action='store_true',
+                       help='With --scrape-atp, re-request ranking weeks that were already scraped '
+                            '(unchanged pages are skipped via conditional requests).')
     parser.add_argument('--test-scrape', action='store_true',
                        help='Quick test scrape for a single date/year/player (prints, does not write).')
     
@@ -35,7 +47,7 @@ def main():
             return
         
         logger.info(f"Scraping rankings for {len(ranking_dates)} dates from {start_year}...")
-        update_rankings(ranking_dates)
+        update_rankings(ranking_dates, force=args.force)
         
         # 2. Scrape tournaments from start year onwards
         today = datetime.today()
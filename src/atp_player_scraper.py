@@ -1,15 +1,63 @@
 import asyncio
+import time
 from requests_html import AsyncHTMLSession
 from bs4 import BeautifulSoup
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 import polars as pl
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from src.file_io import atomic_write_path
 import os
 import glob
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Player overview URL, filled with the URL-friendly name and the ATP id
+PLAYER_URL_TEMPLATE = "https://www.atptour.com/en/players/{}/{}/overview"
+
+# Columns read from the raw rankings files
+RANKING_COLUMNS = pa.schema([
+    ('Rank', pa.string()),
+    ('atp_id', pa.string()),
+    ('atp_name', pa.string()),
+    ('ranking_date', pa.timestamp('ns')),
+])
+
+# Fixed schema for scraped player records (labels from the personal details section,
+# plus identifiers and flattened social links), so every batch writes the same columns
+PLAYER_FIELDS = (
+    'atp_id', 'atp_name', 'player_url', 'full_name', 'country_code', 'country',
+    'age', 'dob', 'birthplace', 'residence', 'height', 'weight', 'plays', 'turned_pro', 'coach',
+    'social_facebook', 'social_instagram', 'social_twitter', 'social_x', 'social_youtube', 'social_tiktok',
+)
+
+
+def _to_player_record(details: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert scraped player details into a flat record with exactly the PLAYER_FIELDS keys.
+    
+    Nested social links are flattened into 'social_<platform>' fields; labels outside
+    the fixed schema are dropped.
+    
+    Args:
+        details (dict): Raw details extracted from the player's page.
+    
+    Returns:
+        dict: Record with one key per entry in PLAYER_FIELDS (missing values are None).
+    """
+    record = dict.fromkeys(PLAYER_FIELDS)
+    for platform, href in details.pop('social_links', {}).items():
+        details[f"social_{platform}"] = href
+    for key, value in details.items():
+        if key in record:
+            record[key] = value
+    return record
+
 async def scrape_atp_player_details(player_url: str) -> Optional[Dict[str, Any]]:
     """
     Scrape all personal details for an ATP player from their overview page.
@@ -18,7 +66,7 @@ async def scrape_atp_player_details(player_url: str) -> Optional[Dict[str, Any]]
         player_url (str): Full URL to the player's overview page.
     
     Returns:
-        dict: Extracted personal details {label: value, ...}, or None if not found.
+        dict: Player record keyed by PLAYER_FIELDS, or None if not found.
     """
     asession = AsyncHTMLSession()
     logger.info(f"Scraping player details from {player_url}")
@@ -29,7 +77,7 @@ async def scrape_atp_player_details(player_url: str) -> Optional[Dict[str, Any]]
         # Increase timeout and sleep time for JavaScript to fully load
         await response.html.arender(timeout=30, sleep=5)
 
-        soup = BeautifulSoup(response.html.raw_html, 'html.parser')
+        soup = BeautifulSoup(response.html.raw_html, 'lxml')
         
         # Extract player details
         details = {}
@@ -58,7 +106,7 @@ async def scrape_atp_player_details(player_url: str) -> Optional[Dict[str, Any]]
                 details['atp_name'] = url_parts[-3]
                 details['atp_id'] = url_parts[-2]
             
-            return details if details else None
+            return _to_player_record(details) if details else None
 
         for li in pd_content.find_all('li'):
             spans = li.find_all('span', recursive=False)
@@ -108,7 +156,7 @@ async def scrape_atp_player_details(player_url: str) -> Optional[Dict[str, Any]]
             details['atp_name'] = url_parts[-3]
             details['atp_id'] = url_parts[-2]
         
-        return details
+        return _to_player_record(details)
     
     except Exception as e:
         logger.error(f"Failed to scrape player details from {player_url}: {e}")
@@ -135,7 +183,7 @@ def prioritize_players(rankings_df: pd.DataFrame, n: int = 100, exclude_ids=None
         rankings_df = rankings_df[~rankings_df['atp_id'].isin(exclude_ids)].copy()
     
     # Convert rank to integer by removing 'T' for tied ranks
-    rankings_df['rank'] = rankings_df['Rank'].astype(str).str.replace('T', '').astype(int)
+    rankings_df['rank'] = rankings_df['Rank'].str.replace('T', '', regex=False).astype('int32[pyarrow]')
     
     # Sort by rank (ascending) and date (ascending)
     sorted_df = rankings_df.sort_values(['rank', 'ranking_date'],
@@ -148,19 +196,188 @@ def prioritize_players(rankings_df: pd.DataFrame, n: int = 100, exclude_ids=None
     return unique_players['atp_id'].head(n).tolist()
 
 
+def _read_ranking_table(path: str) -> pa.Table:
+    """
+    Read the columns needed for player prioritization from a raw rankings file.
+    
+    Args:
+        path (str): Raw rankings file (Parquet, or a legacy CSV dump).
+    
+    Returns:
+        pa.Table: Table with the RANKING_COLUMNS schema.
+    """
+    if path.endswith('.parquet'):
+        table = pq.read_table(path, columns=RANKING_COLUMNS.names)
+    else:
+        convert_options = pacsv.ConvertOptions(
+            include_columns=RANKING_COLUMNS.names,
+            column_types=RANKING_COLUMNS
+        )
+        table = pacsv.read_csv(path, convert_options=convert_options)
+    return table.select(RANKING_COLUMNS.names).cast(RANKING_COLUMNS)
+
+
+def _append_players(players_table: Optional[pa.Table], new_players: List[Dict[str, Any]],
+                    players_parquet: str) -> pa.Table:
+    """
+    Append a batch of scraped players to the players parquet file.
+    
+    Players are kept as an Arrow table whose batches are chained with concat_tables, which
+    only references the existing chunks, so a checkpoint never copies the players already
+    stored; the file itself is rewritten from those chunks.
+    
+    Args:
+        players_table (pa.Table or None): Players already stored on disk.
+        new_players (list): Scraped player detail dicts to append.
+        players_parquet (str): Path to the players parquet file.
+    
+    Returns:
+        pa.Table: The combined players table that was written.
+    """
+    new_table = pa.table({
+        field: pa.array([None if player[field] is None else str(player[field]) for player in new_players],
+                        type=pa.string())
+        for field in PLAYER_FIELDS
+    })
+    if players_table is not None and players_table.num_rows:
+        combined = pa.concat_tables([players_table, new_table], promote_options="permissive")
+    else:
+        combined = new_table
+    
+    # Ensure directory exists
+    os.makedirs(os.path.dirname(players_parquet), exist_ok=True)
+    with atomic_write_path(players_parquet) as tmp_path:
+        pq.write_table(combined, tmp_path)
+    logger.info(f"Appended {new_table.num_rows} new players to {players_parquet}")
+    
+    return combined
+
+
+def _unique_values(table: pa.Table, column: str) -> set:
+    """
+    Return the distinct non-null values of a table column as a set.
+    
+    Args:
+        table (pa.Table): Table to read from.
+        column (str): Column name; a missing column yields an empty set.
+    
+    Returns:
+        set: Distinct non-null values.
+    """
+    if column not in table.column_names:
+        return set()
+    return set(pc.unique(table[column]).drop_null().to_pylist())
+
+
+async def _scrape_player_with_retry(
+    player_url: str,
+    timeout: float = 60,
+    retry_delays: Tuple[float, ...] = (1, 2, 4)
+) -> Optional[Dict[str, Any]]:
+    """
+    Scrape a player's details with a per-attempt timeout and exponential-backoff retries.
+    
+    Args:
+        player_url (str): Full URL to the player's overview page.
+        timeout (float): Seconds allowed for a single attempt (page load plus JavaScript render).
+        retry_delays (tuple): Seconds to wait before each retry.
+    
+    Returns:
+        dict: Extracted personal details, or None if all attempts failed.
+    """
+    for attempt in range(len(retry_delays) + 1):
+        try:
+            details = await asyncio.wait_for(scrape_atp_player_details(player_url), timeout=timeout)
+            if details:
+                return details
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out scraping {player_url} (attempt {attempt + 1})")
+        
+        if attempt < len(retry_delays):
+            await asyncio.sleep(retry_delays[attempt])
+    
+    return None
+
+
+async def _scrape_new_players(
+    player_urls: List[str],
+    players_table: Optional[pa.Table],
+    players_parquet: str,
+    batch_size: int = 25,
+    max_concurrency: int = 4
+) -> Tuple[Optional[pa.Table], int]:
+    """
+    Scrape player pages concurrently and checkpoint results to parquet as they complete.
+    
+    Results are consumed with asyncio.as_completed, so a single slow page does not hold
+    back logging or saving of the players that already finished.
+    
+    Args:
+        player_urls (list): Player overview URLs to scrape.
+        players_table (pa.Table or None): Players already stored on disk.
+        players_parquet (str): Path to the players parquet file.
+        batch_size (int): Number of newly scraped players to accumulate before writing to disk.
+        max_concurrency (int): Maximum number of player pages rendered at the same time.
+    
+    Returns:
+        tuple: (combined players table, number of new players saved)
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def bounded_scrape(url: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        async with semaphore:
+            return url, await _scrape_player_with_retry(url)
+    
+    tasks = [asyncio.create_task(bounded_scrape(url)) for url in player_urls]
+    total = len(tasks)
+    start_time = time.monotonic()
+    
+    combined = players_table
+    new_players = []
+    saved_count = 0
+    for done, future in enumerate(asyncio.as_completed(tasks), start=1):
+        url, details = await future
+        if details:
+            details['player_url'] = url
+            new_players.append(details)
+        else:
+            logger.warning(f"Failed to scrape player {url}")
+        
+        # Estimate remaining time from the average time per completed player
+        elapsed = time.monotonic() - start_time
+        eta = elapsed / done * (total - done)
+        logger.info(f"Scraped {done}/{total} players ({elapsed:.0f}s elapsed, ETA {eta:.0f}s)")
+        
+        # Checkpoint every batch_size new players so a crash loses at most one batch
+        if len(new_players) >= batch_size:
+            combined = _append_players(combined, new_players, players_parquet)
+            saved_count += len(new_players)
+            new_players = []
+    
+    if new_players:
+        combined = _append_players(combined, new_players, players_parquet)
+        saved_count += len(new_players)
+    
+    return combined, saved_count
+
+
 def update_players_from_rankings(
     rankings_base_dir: str = "data/raw/rankings",
     players_parquet: str = "data/raw/players/players_raw.parquet",
-    max_players: Optional[int] = None
+    max_players: Optional[int] = None,
+    batch_size: int = 25,
+    max_concurrency: int = 4
 ):
     """
     Update the players_raw.parquet with new player URLs found in rankings files.
     Supports prioritization and limiting the number of players to scrape.
     
     Args:
-        rankings_base_dir (str): Directory containing raw ranking CSV files.
+        rankings_base_dir (str): Directory containing raw ranking files.
         players_parquet (str): Path to the players parquet file.
         max_players (int or None): Maximum number of players to scrape. If None, scrape all new players.
+        batch_size (int): Number of newly scraped players to accumulate before writing to disk.
+        max_concurrency (int): Maximum number of player pages rendered at the same time.
     
     Returns:
         int: Number of remaining players without data after scraping.
@@ -168,52 +385,49 @@ def update_players_from_rankings(
     logger.info("Updating players from rankings with prioritization and limit...")
     
     # Gather all ranking files
-    ranking_files = glob.glob(os.path.join(rankings_base_dir, "*", "atp_rankings_*_raw.csv"))
+    ranking_files = glob.glob(os.path.join(rankings_base_dir, "*", "atp_rankings_*_raw.*"))
     
-    rankings_list = []
-    for f in ranking_files:
-        df = pd.read_csv(f)
-        rankings_list.append(df)
+    # Read only the columns needed here, with fixed types so the tables concat without promotion;
+    # pyarrow releases the GIL while reading, so files are read in parallel threads
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        rankings_list = list(executor.map(_read_ranking_table, ranking_files))
     
     if not rankings_list:
         logger.warning("No ranking files found.")
         return 0
     
-    rankings_df = pd.concat(rankings_list, ignore_index=True)
-    
-    # Ensure ranking_date is datetime
-    rankings_df['ranking_date'] = pd.to_datetime(rankings_df['ranking_date'])
+    # Concatenate as Arrow tables (no per-chunk copy/re-index) and convert to pandas once,
+    # keeping Arrow-backed columns (contiguous string buffers instead of one object per cell);
+    # ranking_date was already cast to timestamp[ns] by the Arrow reader
+    rankings_df = pa.concat_tables(rankings_list).to_pandas(types_mapper=pd.ArrowDtype)
     
     # Load existing players first to check for duplicates
     if os.path.exists(players_parquet):
-        players_df = pd.read_parquet(players_parquet)
-        known_urls = set(players_df['player_url'].dropna().unique())
-        known_ids = set(players_df['atp_id'].dropna().unique())
+        players_table = pq.read_table(players_parquet)
+        known_urls = _unique_values(players_table, 'player_url')
+        known_ids = _unique_values(players_table, 'atp_id')
     else:
-        players_df = pd.DataFrame()
+        players_table = None
         known_urls = set()
         known_ids = set()
     
-    # Prioritize players if max_players is specified
+    # Vectorized dedup of (atp_id, atp_name) pairs, keeping the first name seen for each unknown id
+    id_names = rankings_df[['atp_id', 'atp_name']].drop_duplicates('atp_id')
+    id_names = id_names[~id_names['atp_id'].isin(known_ids)]
+    id_to_name = dict(zip(id_names['atp_id'].tolist(), id_names['atp_name'].tolist()))
+    
+    # Prioritize players if max_players is specified, otherwise take all new players
     if max_players is not None:
-        priority_ids = prioritize_players(rankings_df, max_players, exclude_ids=known_ids)
-        
-        # Generate player URLs for prioritized players
-        if priority_ids:
-            player_urls_df = rankings_df[rankings_df['atp_id'].isin(priority_ids)].drop_duplicates('atp_id')
-            player_urls_with_ids = [(
-                f"https://www.atptour.com/en/players/{row['atp_name'].replace('.', '')}/{row['atp_id']}/overview",
-                row['atp_id']
-            ) for _, row in player_urls_df.iterrows() if not pd.isna(row['atp_name'])]
-        else:
-            player_urls_with_ids = []
+        candidate_ids = prioritize_players(rankings_df, max_players, exclude_ids=known_ids)
     else:
-        # Generate all player URLs with IDs
-        player_urls_df = rankings_df.drop_duplicates('atp_id')
-        player_urls_with_ids = [(
-            f"https://www.atptour.com/en/players/{row['atp_name'].replace('.', '')}/{row['atp_id']}/overview",
-            row['atp_id']
-        ) for _, row in player_urls_df.iterrows() if not pd.isna(row['atp_name'])]
+        candidate_ids = list(id_to_name)
+    
+    # Generate player URLs with IDs
+    build_url = PLAYER_URL_TEMPLATE.format
+    player_urls_with_ids = [
+        (build_url(id_to_name[atp_id].replace('.', ''), atp_id), atp_id)
+        for atp_id in candidate_ids if not pd.isna(id_to_name.get(atp_id))
+    ]
     
     # Filter new URLs by both URL and ID
     new_urls_with_ids = [(url, atp_id) for url, atp_id in player_urls_with_ids 
@@ -225,34 +439,17 @@ def update_players_from_rankings(
     
     logger.info(f"Found {len(new_urls_with_ids)} new player URLs to scrape.")
     
-    new_players = []
-    for url, _ in new_urls_with_ids:
-        try:
-            details = asyncio.run(scrape_atp_player_details(url))
-            if details:
-                details['player_url'] = url
-                new_players.append(details)
-        except Exception as e:
-            logger.warning(f"Failed to scrape player {url}: {e}")
+    combined, saved_count = asyncio.run(_scrape_new_players(
+        [url for url, _ in new_urls_with_ids], players_table, players_parquet,
+        batch_size=batch_size, max_concurrency=max_concurrency
+    ))
     
-    if new_players:
-        new_df = pd.DataFrame(new_players)
-        if not players_df.empty:
-            combined = pd.concat([players_df, new_df], ignore_index=True)
-        else:
-            combined = new_df
-        
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(players_parquet), exist_ok=True)
-        combined.to_parquet(players_parquet, index=False)
-        logger.info(f"Appended {len(new_df)} new players to {players_parquet}")
-    else:
+    if saved_count == 0:
         logger.info("No new players to add.")
-        combined = players_df
     
     # Count remaining players without data
     all_player_ids = set(rankings_df['atp_id'].dropna().unique())
-    known_ids_updated = set(combined['atp_id'].dropna().unique()) if not combined.empty else known_ids
+    known_ids_updated = _unique_values(combined, 'atp_id') if combined is not None else known_ids
     remaining = len(all_player_ids - known_ids_updated)
     
     logger.info(f"Remaining players without data: {remaining}")
@@ -1,11 +1,15 @@
 import os
-import time
-import requests
+import glob
 import polars as pl
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from bs4 import BeautifulSoup
+from src.http_session import SESSION, REQUEST_TIMEOUT, conditional_get, save_validators, discard_stale_validators, RateLimiter
+from src.file_io import atomic_write_path
 import logging
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +26,12 @@ def get_available_ranking_dates(start_year: Optional[int] = None) -> List[str]:
                    sorted from oldest to newest
     """
     url = "https://www.atptour.com/en/rankings/singles"
-    headers = {"User-Agent": "Mozilla/5.0"}
     
     logger.info("Fetching available ranking dates from ATP website...")
-    response = requests.get(url, headers=headers)
+    response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
     
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(response.content, "lxml")
     
     # Find the date filter dropdown
     date_select = soup.find('select', {'id': 'dateWeek-filter'})
@@ -59,41 +62,36 @@ def get_available_ranking_dates(start_year: Optional[int] = None) -> List[str]:
     return dates
 
 
-def scrape_atp_rankings_by_date(date: str) -> Optional[pd.DataFrame]:
+def scrape_atp_rankings_columns(date: str, meta_path: Optional[str] = None) -> Optional[Dict[str, list]]:
     """
-    Scrape ATP singles rankings for a given date from the ATP Tour website.
+    Scrape the ATP singles rankings table for a given date into column lists.
     
-    This function retrieves the ATP singles rankings table for a specified date,
-    extracts player information including names, ranks, points, and player IDs,
-    and returns the data as a structured DataFrame.
+    This is the parsing core shared by scrape_atp_rankings_by_date and the raw-file writer,
+    which builds an Arrow table directly from the columns without a pandas DataFrame.
     
     Args:
         date (str): Date in YYYY-MM-DD format for which to scrape rankings
+        meta_path (str, optional): Validators sidecar for a conditional request (see conditional_get)
     
     Returns:
-        Optional[pd.DataFrame]: DataFrame containing the rankings data with columns:
-            - Rank: Player's numerical ranking
-            - Player: Player's full name
-            - rank_change: Change in ranking (up/down/unchanged)
-            - Points: ATP ranking points
-            - atp_id: Player's unique ATP ID code
-            - atp_name: Player's name in URL-friendly format
-            - ranking_date: The date of the rankings (as datetime)
-        Returns None if no ranking table is found for the given date.
+        Optional[Dict[str, list]]: Column name -> values, in table order (without ranking_date).
+        Returns None if no ranking table is found for the given date, or if the page
+        has not been modified since the validators in meta_path were stored.
     
     Raises:
         requests.exceptions.HTTPError: If the HTTP request to ATP website fails
     """
     # Construct URL for ATP rankings page with date parameter
     url = f"https://www.atptour.com/en/rankings/singles?rankRange=0-5000&dateWeek={date}"
-    headers = {"User-Agent": "Mozilla/5.0"}
     logger.info(f"Requesting {url}")
     
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()  # Raise exception for HTTP errors
+    response = conditional_get(url, meta_path)
+    if response is None:
+        logger.info(f"Rankings for {date} not modified since last scrape")
+        return None
     
     # Parse HTML content
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(response.content, "lxml")
     
     # Find the rankings table
     table = soup.find('table', class_='mega-table desktop-table non-live')
@@ -106,40 +104,31 @@ def scrape_atp_rankings_by_date(date: str) -> Optional[pd.DataFrame]:
     header_row = table.find("tr")
     headers_list = [th.get_text(strip=True) for th in header_row.find_all("th")][1:]
     
-    # Extract table data
-    data = []
+    # All extracted columns: the player cell yields both name and rank change, plus the ids
+    headers_full = headers_list[:2] + ['rank_change'] + headers_list[2:] + ['atp_id', 'atp_name']
+    
+    # Extract table data column-wise (dict of lists) so the DataFrame is built without a row transpose
+    columns = {header: [] for header in headers_full}
+    column_lists = list(columns.values())
     for tr in table.tbody.find_all('tr'):
         tds = tr.find_all('td')
         if not tds or len(tds) == 1:
             continue
         
-        row = []
-        for idx, td in enumerate(tds):
-            if idx == 1:
-                # Extract player name from the player cell
-                name_li = td.find('li', class_='name center')
-                player_name = name_li.get_text(strip=True) if name_li else ""
-                
-                # Extract rank change indicator (up/down/unchanged)
-                rank_up = td.find('span', class_='rank-up')
-                rank_down = td.find('span', class_='rank-down')
-                
-                if rank_up:
-                    rank_change = rank_up.get_text(strip=True)
-                elif rank_down:
-                    rank_change = rank_down.get_text(strip=True)
-                else:
-                    rank_change = "0"  # No change in ranking
-                
-                row.append(player_name)
-                row.append(rank_change)
-            else:
-                # Extract text for other cells (rank, points, etc.)
-                row.append(td.get_text(strip=True))
+        # Player cell: name, rank change indicator (up/down/unchanged) and profile link
+        player_td = tds[1]
+        name_li = player_td.find('li', class_='name center')
+        player_name = name_li.get_text(strip=True) if name_li else ""
+        
+        rank_span = player_td.find('span', class_='rank-up') or player_td.find('span', class_='rank-down')
+        rank_change = rank_span.get_text(strip=True) if rank_span else "0"  # "0" means no change
+        
+        # Rank cell first, then the player cell's two values, then the remaining cells (points, etc.)
+        row = [tds[0].get_text(strip=True), player_name, rank_change]
+        row += [td.get_text(strip=True) for td in tds[2:]]
         
         # Extract player identifiers from profile URL
-        player_td = tds[1]
-        atp_id, atp_name, player_url = "", "", ""
+        atp_id, atp_name = "", ""
         
         profile_link = player_td.find("a", href=True)
         if profile_link and "/players/" in profile_link['href']:
@@ -149,11 +138,47 @@ def scrape_atp_rankings_by_date(date: str) -> Optional[pd.DataFrame]:
                 atp_id = parts[4]    # Unique player ID
         
         row += [atp_id, atp_name]
-        data.append(row)
+        for column_list, value in zip(column_lists, row, strict=True):
+            column_list.append(value)
+    
+    save_validators(response, meta_path)
+    
+    return columns
+
+
+def scrape_atp_rankings_by_date(date: str, meta_path: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Scrape ATP singles rankings for a given date from the ATP Tour website.
+    
+    This function retrieves the ATP singles rankings table for a specified date,
+    extracts player information including names, ranks, points, and player IDs,
+    and returns the data as a structured DataFrame.
+    
+    Args:
+        date (str): Date in YYYY-MM-DD format for which to scrape rankings
+        meta_path (str, optional): Validators sidecar for a conditional request (see conditional_get)
+    
+    Returns:
+        Optional[pd.DataFrame]: DataFrame containing the rankings data with columns:
+            - Rank: Player's numerical ranking
+            - Player: Player's full name
+            - rank_change: Change in ranking (up/down/unchanged)
+            - Points: ATP ranking points
+            - atp_id: Player's unique ATP ID code
+            - atp_name: Player's name in URL-friendly format
+            - ranking_date: The date of the rankings (as datetime)
+        Returns None if no ranking table is found for the given date, or if the page
+        has not been modified since the validators in meta_path were stored.
+    
+    Raises:
+        requests.exceptions.HTTPError: If the HTTP request to ATP website fails
+    """
+    columns = scrape_atp_rankings_columns(date, meta_path=meta_path)
+    if columns is None:
+        return None
     
     # Create DataFrame with all extracted columns
-    headers_full = headers_list[:2] + ['rank_change'] + headers_list[2:] + ['atp_id', 'atp_name']
-    df = pd.DataFrame(data, columns=headers_full)
+    df = pd.DataFrame(columns, copy=False)
     
     # Add ranking date column
     df['ranking_date'] = pd.to_datetime(date)
@@ -161,34 +186,81 @@ def scrape_atp_rankings_by_date(date: str) -> Optional[pd.DataFrame]:
     return df
 
 
-def update_rankings(dates: List[str], raw_base_dir: str = "data/raw/rankings", sleep_sec: float = 1):
+def _scrape_and_save_rankings(date: str, out_path: str, rate_limiter: RateLimiter) -> None:
+    """
+    Scrape rankings for a single date and save them to out_path.
+    
+    Args:
+        date: Date in YYYY-MM-DD format
+        out_path: Path of the raw Parquet file to write
+        rate_limiter: Shared limiter spacing out requests to avoid being blocked
+    """
+    meta_path = out_path.replace("_raw.parquet", "_meta.json")
+    discard_stale_validators(meta_path, out_path)
+    
+    rate_limiter.wait()
+    logger.info(f"Scraping rankings for {date}")
+    columns = scrape_atp_rankings_columns(date, meta_path=meta_path)
+    
+    if columns and columns['atp_id']:
+        # Build the Arrow table straight from the column lists; no DataFrame is needed to write
+        table = pa.table(columns)
+        ranking_date = pd.Timestamp(date).to_pydatetime()
+        table = table.append_column(
+            'ranking_date', pa.array([ranking_date] * table.num_rows, type=pa.timestamp('ns'))
+        )
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with atomic_write_path(out_path) as tmp_path:
+            pq.write_table(table, tmp_path, compression="zstd")
+        logger.info(f"Saved rankings for {date} to {out_path}")
+        
+        # Drop a legacy CSV dump of the same date so it isn't read twice
+        legacy_path = os.path.splitext(out_path)[0] + ".csv"
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+
+def update_rankings(dates: List[str], raw_base_dir: str = "data/raw/rankings", sleep_sec: float = 1,
+                    max_workers: int = 4, force: bool = False):
     """
     Update rankings data, only scraping dates that don't already exist in the raw folders.
     
+    Missing dates are fetched by a bounded thread pool so network round trips overlap,
+    while a shared rate limiter keeps request starts at least sleep_sec apart overall.
+    Pages are requested conditionally (ETag/Last-Modified), so forced re-scrapes of
+    unchanged weeks skip the download and parse.
+    
     Args:
         dates: List of dates to scrape in YYYY-MM-DD format
         raw_base_dir: Base directory for storing raw ranking files
-        sleep_sec: Seconds to sleep between requests to avoid being blocked
+        sleep_sec: Minimum seconds between the starts of two requests, to avoid being blocked
+        max_workers: Maximum number of concurrent requests
+        force: Re-request dates that already have a raw file
     """
+    # Snapshot already-scraped raw files once instead of stat()-ing every date
+    # (compared without extension so legacy CSV dumps also count as scraped)
+    existing_paths = {
+        os.path.splitext(path)[0]
+        for path in glob.glob(os.path.join(raw_base_dir, "*", "atp_rankings_*_raw.*"))
+    }
+    
+    pending = []
     for date in dates:
         year = pd.to_datetime(date).year
         raw_dir = os.path.join(raw_base_dir, str(year))
-        out_path = os.path.join(raw_dir, f"atp_rankings_{date.replace('-', '')}_raw.csv")
+        out_path = os.path.join(raw_dir, f"atp_rankings_{date.replace('-', '')}_raw.parquet")
         
         # Skip if file already exists
-        if os.path.exists(out_path):
+        if os.path.splitext(out_path)[0] in existing_paths and not force:
             logger.info(f"Skipping {date}, file already exists: {out_path}")
             continue
         
-        # Only scrape if file doesn't exist
-        logger.info(f"Scraping rankings for {date}")
-        df = scrape_atp_rankings_by_date(date)
-        
-        if df is not None and not df.empty:
-            os.makedirs(raw_dir, exist_ok=True)
-            df.to_csv(out_path, index=False)
-            logger.info(f"Saved rankings for {date} to {out_path}")
-        
-        # Sleep to avoid being blocked
-        logger.info(f"Sleeping for {sleep_sec} seconds before next request")
-        time.sleep(sleep_sec)
\ No newline at end of file
+        pending.append((date, out_path))
+    
+    # Only scrape dates whose file doesn't exist
+    rate_limiter = RateLimiter(sleep_sec)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_scrape_and_save_rankings, date, out_path, rate_limiter)
+                   for date, out_path in pending]
+        for future in futures:
+            future.result()  # Re-raise HTTP errors from the workers
@@ -1,16 +1,66 @@
 import os
-import time
-import requests
+import re
+import calendar
+from datetime import date
+from functools import lru_cache
 import polars as pl
 import pandas as pd
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from src.http_session import RateLimiter, conditional_get, save_validators, discard_stale_validators
+from src.file_io import atomic_write_path
 from dateutil import parser as dateparser
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional, List
 
 logger = logging.getLogger(__name__)
 
 
+# Fast path for the dominant archive formats, "31 December, 2023" and "Jul 13, 2024"
+DAY_MONTH_YEAR_RE = re.compile(r'(\d{1,2})\s+([A-Za-z]+),?\s+(\d{4})')
+MONTH_DAY_YEAR_RE = re.compile(r'([A-Za-z]+)\s+(\d{1,2}),?\s+(\d{4})')
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+
+# Separator between the start and end of a date range, e.g. " - " or "–"
+DATE_RANGE_SEP_RE = re.compile(r'\s*[-–]\s*')
+
+# Restricts parsing of the results archive page to the tournament lists
+EVENTS_STRAINER = SoupStrainer('ul', class_='events')
+
+# Vertical bars and dashes stripped from venue text in a single translate() pass
+VENUE_SEPARATORS = str.maketrans('', '', '|–-')
+
+
+def _parse_date(text: str) -> date:
+    """
+    Parse a single date string, trying the precompiled fast-path patterns before dateutil.
+    
+    Args:
+        text: Date string such as "31 December, 2023" or "Jul 13, 2024"
+    
+    Returns:
+        date: The parsed date
+    
+    Raises:
+        ValueError: If the string cannot be parsed
+    """
+    text = text.strip()
+    match = DAY_MONTH_YEAR_RE.fullmatch(text)
+    if match:
+        day, month_name, year = match.groups()
+    else:
+        match = MONTH_DAY_YEAR_RE.fullmatch(text)
+        if match:
+            month_name, day, year = match.groups()
+    
+    if match and month_name.lower() in MONTHS:
+        return date(int(year), MONTHS[month_name.lower()], int(day))
+    
+    return dateparser.parse(text, dayfirst=False, fuzzy=True).date()
+
+
+@lru_cache(maxsize=4096)
 def parse_tournament_date(date_str: str) -> Tuple[Optional[str], Optional[str]]:
     """
     Parse a tournament date range string into start and end date.
@@ -20,6 +70,8 @@ def parse_tournament_date(date_str: str) -> Tuple[Optional[str], Optional[str]]:
         "Jul 13, 2024 - Aug 15, 2025"
         "1 January, 2024"
         
+    Results are memoized, since the same date strings recur across tournaments and scrapes.
+        
     Returns:
         (start_date, end_date) as ISO strings (YYYY-MM-DD), or (start_date, None) if only one date.
         If parsing fails, returns (None, None).
@@ -27,34 +79,32 @@ def parse_tournament_date(date_str: str) -> Tuple[Optional[str], Optional[str]]:
     if not date_str or not isinstance(date_str, str):
         return None, None
     
-    # Try to split on common range separators
-    for sep in [" - ", "–", "-"]:
-        if sep in date_str:
-            parts = [p.strip() for p in date_str.split(sep, 1)]
-            try:
-                # Parse end date
-                end = dateparser.parse(parts[1], dayfirst=False, fuzzy=True)
-                # Heuristic for missing year in start date
-                if len(parts[0].split(" ")) == 1:
-                    # Only day (e.g. "1" or "Jan"), append year and month from end date
-                    start = dateparser.parse(parts[0] + " " + " ".join(parts[1].split(" ")[-2:]), dayfirst=False, fuzzy=True)
-                elif len(parts[0].split(" ")) == 2:
-                    # Day and month, append year from end date
-                    start = dateparser.parse(parts[0] + " " + parts[1].split(" ")[-1], dayfirst=False, fuzzy=True)
-                else:
-                    start = dateparser.parse(parts[0], dayfirst=False, fuzzy=True)
-                return start.date().isoformat(), end.date().isoformat()
-            except Exception:
-                pass
+    # Split once on the first range separator (hyphen or en dash, with optional spaces)
+    parts = [p.strip() for p in DATE_RANGE_SEP_RE.split(date_str, maxsplit=1)]
+    if len(parts) == 2:
+        try:
+            # Parse end date
+            end = _parse_date(parts[1])
+            # Heuristic for missing year in start date
+            if len(parts[0].split(" ")) == 1:
+                # Only day (e.g. "1" or "Jan"), append year and month from end date
+                start = _parse_date(parts[0] + " " + " ".join(parts[1].split(" ")[-2:]))
+            elif len(parts[0].split(" ")) == 2:
+                # Day and month, append year from end date
+                start = _parse_date(parts[0] + " " + parts[1].split(" ")[-1])
+            else:
+                start = _parse_date(parts[0])
+            return start.isoformat(), end.isoformat()
+        except Exception:
+            pass
     # Try to parse as a single date
     try:
-        dt = dateparser.parse(date_str, dayfirst=False, fuzzy=True)
-        return dt.date().isoformat(), None
+        return _parse_date(date_str).isoformat(), None
     except Exception:
         return None, None
     
 
-def scrape_atp_events(year: int, tournament_type: str) -> pd.DataFrame:
+def scrape_atp_events(year: int, tournament_type: str, meta_path: Optional[str] = None) -> Optional[pd.DataFrame]:
     """
     Scrape all tournament events for a given year and tournament type from the ATP archive.
     Only includes tournaments that are finished (have a singles winner).
@@ -63,153 +113,218 @@ def scrape_atp_events(year: int, tournament_type: str) -> pd.DataFrame:
     Args:
         year (int): Year to scrape (e.g. 2024)
         tournament_type (str): Tournament type code ('gs', 'atp', 'ch', 'fu')
+        meta_path (str, optional): Validators sidecar for a conditional request (see conditional_get)
 
     Returns:
-        pd.DataFrame: DataFrame with one row per tournament, columns for all extracted fields.
+        Optional[pd.DataFrame]: DataFrame with one row per tournament, columns for all extracted fields.
+        Returns None if the page has not been modified since the validators in meta_path were stored.
     """
     BASE_URL = "https://www.atptour.com/en/scores/results-archive"
     url = f"{BASE_URL}?year={year}&tournamentType={tournament_type}"
-    headers = {"User-Agent": "Mozilla/5.0"}
     logger.info(f"Scraping {url}")
 
-    r = requests.get(url, headers=headers)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, 'html.parser')
-
-    extracted_data = []
-    # Loop over all <ul class="events"> blocks (each may contain multiple tournaments)
-    for ul_events in soup.find_all('ul', class_='events'):
-        # Each tournament is a <li> inside the <ul>
-        for li in ul_events.find_all('li', recursive=False):
-            event = {
-                "year": year,
-                "tournament_type": tournament_type
-            }
-            # Tournament info
-            tournament_info = li.find('div', class_='tournament-info')
-            if tournament_info:
-                # Badge image (ATP 250, 500, etc.)
-                badge_img = tournament_info.find('img', class_='events_banner')
-                event['badge_alt'] = badge_img.get('alt', '') if badge_img else ''
-                event['badge_src'] = badge_img.get('src', '') if badge_img else ''
-                event['badge_title'] = badge_img.get('title', '') if badge_img else ''
-
-                # Tournament profile link and details
-                profile_link = tournament_info.find('a', class_='tournament__profile')
-                event['tournament_url'] = profile_link.get('href', '') if profile_link else ''
-                details_holder = profile_link.find('div', class_='details-holder') if profile_link else None
-                if details_holder:
-                    # Top details (name, flag)
-                    top_div = details_holder.find('div', class_='top')
-                    if top_div:
-                        name_span = top_div.find('span', class_='name')
-                        event['tournament_name'] = name_span.get_text(strip=True) if name_span else ''
-                        flag_span = top_div.find('span', class_='flag')
-                        if flag_span:
-                            use_tag = flag_span.find('use')
-                            if use_tag:
-                                href = use_tag.get('href', '')
-                                if '#flag-' in href:
-                                    event['country_code'] = href.split('#flag-')[-1]
-                                else:
-                                    event['country_code'] = ''
-                            else:
-                                event['country_code'] = ''
-                        else:
-                            event['country_code'] = ''
-                    # Bottom details (venue, date)
-                    bottom_div = details_holder.find('div', class_='bottom')
-                    if bottom_div:
-                        venue_span = bottom_div.find('span', class_='venue')
-                        # Remove all vertical bars/dashes and extra whitespace
-                        event['venue'] = venue_span.get_text(strip=True).replace("|", "").replace("–", "").replace("-", "").strip() if venue_span else ''
-                        date_span = bottom_div.find('span', class_='Date')
-                        event['date_range'] = date_span.get_text(strip=True) if date_span else ''
-                        # Parse start and end date
-                        start_date, end_date = parse_tournament_date(event['date_range'])
-                        event['start_date'] = start_date
-                        event['end_date'] = end_date
-
-            # Winners info
-            cta_holder = li.find('div', class_='cta-holder')
-            singles_winner_found = False
-            if cta_holder:
-                winners = cta_holder.find_all('dl', class_='winner')
-                for winner_dl in winners:
-                    dt = winner_dl.find('dt')
-                    dd_tags = winner_dl.find_all('dd')
-                    if dt and dd_tags:
-                        winner_type = dt.get_text(strip=True).lower().replace(' ', '_')  # e.g. singles_winner
-                        winner_names = []
-                        winner_urls = []
-                        for dd in dd_tags:
-                            a_tag = dd.find('a')
-                            if a_tag:
-                                winner_names.append(a_tag.get_text(strip=True))
-                                winner_urls.append(a_tag.get('href', ''))
-                        event[winner_type + '_names'] = winner_names
-                        event[winner_type + '_urls'] = winner_urls
-                        if winner_type == "singles_winner" and winner_names:
-                            singles_winner_found = True
-
-            # Only include tournaments with a singles winner (finished)
-            if not singles_winner_found:
-                continue
+    r = conditional_get(url, meta_path)
+    if r is None:
+        logger.info(f"Tournaments for {year} {tournament_type} not modified since last scrape")
+        return None
+    # Only build the tree for the <ul class="events"> blocks; the rest of the page is skipped
+    soup = BeautifulSoup(r.content, 'lxml', parse_only=EVENTS_STRAINER)
+
+    # Events are accumulated column-wise (dict of lists) so the DataFrame is built
+    # without transposing a list of per-row dicts
+    columns = {}
+    n_rows = 0
+    # Each tournament is a direct <li> child of a <ul class="events"> block; CSS selectors
+    # are compiled (and cached) by soupsieve, replacing chains of per-call find() filters
+    for li in soup.select('ul.events > li'):
+        event = {
+            "year": year,
+            "tournament_type": tournament_type
+        }
+        # Tournament info
+        tournament_info = li.select_one('div.tournament-info')
+        if tournament_info:
+            # Badge image (ATP 250, 500, etc.)
+            badge_img = tournament_info.select_one('img.events_banner')
+            event['badge_alt'] = badge_img.get('alt', '') if badge_img else ''
+            event['badge_src'] = badge_img.get('src', '') if badge_img else ''
+            event['badge_title'] = badge_img.get('title', '') if badge_img else ''
+
+            # Tournament profile link and details
+            profile_link = tournament_info.select_one('a.tournament__profile')
+            event['tournament_url'] = profile_link.get('href', '') if profile_link else ''
+            details_holder = profile_link.select_one('div.details-holder') if profile_link else None
+            if details_holder:
+                # Top details (name, flag)
+                top_div = details_holder.select_one('div.top')
+                if top_div:
+                    name_span = top_div.select_one('span.name')
+                    event['tournament_name'] = name_span.get_text(strip=True) if name_span else ''
+                    use_tag = top_div.select_one('span.flag use')
+                    href = use_tag.get('href', '') if use_tag else ''
+                    event['country_code'] = href.split('#flag-')[-1] if '#flag-' in href else ''
+                # Bottom details (venue, date)
+                bottom_div = details_holder.select_one('div.bottom')
+                if bottom_div:
+                    venue_span = bottom_div.select_one('span.venue')
+                    # Remove all vertical bars/dashes and extra whitespace
+                    event['venue'] = venue_span.get_text(strip=True).translate(VENUE_SEPARATORS).strip() if venue_span else ''
+                    date_span = bottom_div.select_one('span.Date')
+                    # Start and end dates are parsed for the whole page after the loop
+                    event['date_range'] = date_span.get_text(strip=True) if date_span else ''
 
-            # Results URL
-            non_live_cta = li.find('div', class_='non-live-cta')
-            if non_live_cta:
-                results_link = non_live_cta.find('a', class_='results')
-                event['results_url'] = results_link.get('href', '') if results_link else ''
+        # Winners info
+        cta_holder = li.select_one('div.cta-holder')
+        singles_winner_found = False
+        if cta_holder:
+            for winner_dl in cta_holder.select('dl.winner'):
+                dt = winner_dl.select_one('dt')
+                dd_tags = winner_dl.select('dd')
+                if dt and dd_tags:
+                    winner_type = dt.get_text(strip=True).lower().replace(' ', '_')  # e.g. singles_winner
+                    winner_names = []
+                    winner_urls = []
+                    for dd in dd_tags:
+                        a_tag = dd.select_one('a')
+                        if a_tag:
+                            winner_names.append(a_tag.get_text(strip=True))
+                            winner_urls.append(a_tag.get('href', ''))
+                    event[winner_type + '_names'] = winner_names
+                    event[winner_type + '_urls'] = winner_urls
+                    if winner_type == "singles_winner" and winner_names:
+                        singles_winner_found = True
 
-            extracted_data.append(event)
+        # Only include tournaments with a singles winner (finished)
+        if not singles_winner_found:
+            continue
 
-    # Build DataFrame and ensure all date columns are date type
-    df = pd.DataFrame(extracted_data)
-    if not df.empty:
-        for date_col in ['start_date', 'end_date']:
-            if date_col in df.columns:
-                df[date_col] = pd.to_datetime(df[date_col], errors='coerce').dt.date
+        # Results URL
+        non_live_cta = li.select_one('div.non-live-cta')
+        if non_live_cta:
+            results_link = non_live_cta.select_one('a.results')
+            event['results_url'] = results_link.get('href', '') if results_link else ''
+
+        # Fields are optional per event: backfill columns first seen now, pad the ones it lacks
+        for key, value in event.items():
+            if key not in columns:
+                columns[key] = [None] * n_rows
+            columns[key].append(value)
+        n_rows += 1
+        for column in columns.values():
+            if len(column) < n_rows:
+                column.append(None)
+
+    # Build DataFrame and parse all date ranges of the page in one batch
+    df = pd.DataFrame(columns)
+    if not df.empty and 'date_range' in df.columns:
+        start_dates, end_dates = _parse_date_ranges(df['date_range'])
+        position = df.columns.get_loc('date_range') + 1
+        df.insert(position, 'start_date', start_dates)
+        df.insert(position + 1, 'end_date', end_dates)
+    
+    save_validators(r, meta_path)
     return df
 
 
-def update_tournaments(years: List[int], tournament_types: List[str]) -> None:
+def _parse_date_ranges(date_ranges: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Parse a column of tournament date range strings into start and end date columns.
+    
+    Each distinct string is parsed once, and the resulting ISO strings are converted to dates
+    with an explicit format (cache=True converts each distinct date string only once).
+    
+    Args:
+        date_ranges: Date range strings as scraped, e.g. "31 December, 2023 - 7 January, 2024"
+    
+    Returns:
+        (start_dates, end_dates) as Series of datetime.date (NaT where parsing failed)
+    """
+    parsed = {text: parse_tournament_date(text) for text in date_ranges.dropna().unique()}
+    starts = date_ranges.map(lambda text: parsed.get(text, (None, None))[0])
+    ends = date_ranges.map(lambda text: parsed.get(text, (None, None))[1])
+    
+    start_dates = pd.to_datetime(starts, format='%Y-%m-%d', errors='coerce', cache=True).dt.date
+    end_dates = pd.to_datetime(ends, format='%Y-%m-%d', errors='coerce', cache=True).dt.date
+    return start_dates, end_dates
+
+
+def _scrape_and_save_tournaments(year: int, tournament_type: str, output_path: str,
+                                 rate_limiter: RateLimiter) -> None:
+    """
+    Scrape tournaments for one year and type and save them to output_path.
+    
+    Args:
+        year: Year to scrape
+        tournament_type: Tournament type code ('gs', 'atp', 'ch', 'fu')
+        output_path: Path of the raw Parquet file to write
+        rate_limiter: Shared limiter spacing out requests to avoid overwhelming the server
+    """
+    # Validators live next to the data (dot-prefixed, so the raw file globs skip them)
+    meta_path = os.path.join(os.path.dirname(output_path), f".etag_{tournament_type}.json")
+    discard_stale_validators(meta_path, output_path)
+    
+    rate_limiter.wait()
+    logger.info(f"Scraping {year} {tournament_type} tournaments")
+    try:
+        df = scrape_atp_events(year, tournament_type, meta_path=meta_path)
+        
+        if df is None:
+            return
+        if not df.empty:
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with atomic_write_path(output_path) as tmp_path:
+                df.to_parquet(tmp_path, compression="zstd", index=False)
+            logger.info(f"Saved {len(df)} tournaments to {output_path}")
+            
+            # Drop a legacy CSV dump of the same year/type so it isn't read twice
+            legacy_path = os.path.splitext(output_path)[0] + ".csv"
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
+        else:
+            logger.warning(f"No data found for {year} {tournament_type}")
+    except Exception as e:
+        logger.error(f"Error scraping {year} {tournament_type}: {e}")
+
+
+def update_tournaments(years: List[int], tournament_types: List[str], max_workers: int = 4,
+                       sleep_sec: float = 1) -> None:
     """
     Update tournament data for specified years and tournament types.
-    Always overwrites the most recent year with tournament data, even if not current year.
+    Always overwrites the most recent year with tournament data, even if not current year;
+    those pages are requested conditionally (ETag/Last-Modified), so unchanged ones are skipped.
+    
+    Year/type pages are fetched by a bounded thread pool so network round trips overlap,
+    while a shared rate limiter keeps request starts at least sleep_sec apart overall.
     
     Args:
         years: List of years to scrape
         tournament_types: List of tournament types ('gs', 'atp', 'ch', 'fu')
+        max_workers: Maximum number of concurrent requests
+        sleep_sec: Minimum seconds between the starts of two requests
     """
     # Find the most recent year with tournament files
     most_recent_year = find_most_recent_year_with_files("data/raw/tournaments")
 
+    pending = []
     for year in years:        
         for tournament_type in tournament_types:
-            output_path = f"data/raw/tournaments/{year}/tournaments_{tournament_type}_{year}_raw.csv"
+            output_path = f"data/raw/tournaments/{year}/tournaments_{tournament_type}_{year}_raw.parquet"
+            legacy_path = os.path.splitext(output_path)[0] + ".csv"
             
-            if os.path.exists(output_path) and year != most_recent_year:
+            if (os.path.exists(output_path) or os.path.exists(legacy_path)) and year != most_recent_year:
                 logger.info(f"Skipping {year} {tournament_type} - file already exists")
                 continue
-                
-            # Always process most recent year or years without existing files
-            logger.info(f"Scraping {year} {tournament_type} tournaments")
-            try:
-                df = scrape_atp_events(year, tournament_type)
-                
-                if df is not None and not df.empty:
-                    # Create directory if it doesn't exist
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    df.to_csv(output_path, index=False)
-                    logger.info(f"Saved {len(df)} tournaments to {output_path}")
-                else:
-                    logger.warning(f"No data found for {year} {tournament_type}")
-            except Exception as e:
-                logger.error(f"Error scraping {year} {tournament_type}: {e}")            
             
-            # Add a small delay to avoid overwhelming the server
-            time.sleep(1)
+            # Always process most recent year or years without existing files
+            pending.append((year, tournament_type, output_path))
+    
+    rate_limiter = RateLimiter(sleep_sec)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_scrape_and_save_tournaments, year, tournament_type, output_path, rate_limiter)
+                   for year, tournament_type, output_path in pending]
+        for future in futures:
+            future.result()  # Re-raise errors from the workers
 
 
 def find_most_recent_year_with_files(base_path: str) -> Optional[int]:
@@ -239,7 +354,7 @@ def find_most_recent_year_with_files(base_path: str) -> Optional[int]:
     for year_dir in year_dirs:
         year_path = os.path.join(base_path, year_dir)
         files = [f for f in os.listdir(year_path) 
-                if f.startswith('tournaments_') and f.endswith('_raw.csv')]
+                if f.startswith('tournaments_') and f.endswith(('_raw.parquet', '_raw.csv'))]
         if files:
             return int(year_dir)
             
@@ -1,107 +1,128 @@
+from functools import lru_cache
 import polars as pl
-import pandas as pd
-from typing import Union, Optional
+import numpy as np
+from typing import Union, Optional, Tuple
 from pandas import DataFrame, Timestamp
 
 
-def load_players() -> pl.DataFrame:
+def _scan_parquet(path: str, columns: Optional[Tuple[str, ...]] = None) -> pl.DataFrame:
+    """
+    Read a parquet file through a lazy scan, so the column projection is pushed into the reader.
+    
+    Args:
+        path: Path to the parquet file
+        columns: Optional tuple of columns to read (all columns if None)
+    
+    Returns:
+        pl.DataFrame: The collected data
+    """
+    lf = pl.scan_parquet(path)
+    if columns:
+        lf = lf.select(columns)
+    return lf.collect()
+
+
+@lru_cache(maxsize=4)
+def load_players(columns: Optional[Tuple[str, ...]] = None) -> pl.DataFrame:
     """
     Load preprocessed player data for the app.
     
+    Args:
+        columns: Optional tuple of columns to read; only these are decoded from the file
+    
     Returns:
         pl.DataFrame: Player data containing columns such as 'atp_id', 'atp_name',
                   'full_name', 'dob', and 'country_code'
     """
-    return pl.read_parquet("data/atp_players.parquet")
+    return _scan_parquet("data/atp_players.parquet", columns)
 
 
-def load_rankings() -> pl.DataFrame:
+@lru_cache(maxsize=4)
+def load_rankings(columns: Optional[Tuple[str, ...]] = None) -> pl.DataFrame:
     """
     Load preprocessed rankings data for the app.
     
+    Args:
+        columns: Optional tuple of columns to read; only these are decoded from the file
+    
     Returns:
         pl.DataFrame: Rankings data containing columns such as 'atp_id', 'atp_name',
                   'ranking_date', and 'rank'
     """
-    return pl.read_parquet("data/atp_rankings.parquet")
+    return _scan_parquet("data/atp_rankings.parquet", columns)
 
 
-def load_tournaments() -> pl.DataFrame:
+@lru_cache(maxsize=4)
+def load_tournaments(columns: Optional[Tuple[str, ...]] = None) -> pl.DataFrame:
     """
     Load preprocessed tournament data for the app.
     
-    Converts string representations of lists (from parquet storage) back into 
-    actual Python lists for the winner names and URLs columns.
+    The winner names and URLs columns are stored as native Parquet list columns,
+    so they are read as pl.List(pl.Utf8) without any per-row parsing.
+    
+    Args:
+        columns: Optional tuple of columns to read; only these are decoded from the file
     
     Returns:
         pl.DataFrame: Tournament data containing columns such as 'tournament_name',
                   'start_date', 'end_date', 'tournament_type', 'singles_winner_names',
                   'singles_winner_urls', and 'venue'
     """
-    import ast
-
-    # Load the raw data from parquet file
-    df = pl.read_parquet("data/atp_tournaments.parquet")
-    
-    # Convert string representations of lists to actual lists
-    if 'singles_winner_names' in df.columns:
-        df = df.with_columns(
-            pl.col('singles_winner_names').map_elements(
-                lambda x: ast.literal_eval(x) if isinstance(x, str) and x.startswith('[') else x,
-                return_dtype=pl.Object  # Specify the return type
-            )
-        )
+    return _scan_parquet("data/atp_tournaments.parquet", columns)
 
-    if 'singles_winner_urls' in df.columns:
-        df = df.with_columns(
-            pl.col('singles_winner_urls').map_elements(
-                lambda x: ast.literal_eval(x) if isinstance(x, str) and x.startswith('[') else x,
-                return_dtype=pl.Object  # Specify the return type
-            )
-        )
 
-    return df
+def clear_data_cache() -> None:
+    """
+    Drop the cached player, rankings and tournament frames so the next load re-reads disk.
+    
+    The loaders are memoized in-process and return the same Polars frame on every call
+    (safe to share, since Polars operations return new frames). Call this after the
+    preprocessed parquet files have been regenerated.
+    """
+    load_players.cache_clear()
+    load_rankings.cache_clear()
+    load_tournaments.cache_clear()
 
 
-def interpolate_rank_at_date(player_data: pl.DataFrame, target_date: pl.Date) -> float:
+def interpolate_rank_at_date(dates: np.ndarray, ranks: np.ndarray, target_date: np.datetime64) -> float:
     """
     Interpolate the rank value for the target_date between the two nearest ranking dates.
     
+    The caller converts a player's history to arrays once and reuses them for every
+    target date, so each call is a binary search plus scalar arithmetic.
+    
     Args:
-        player_data: DataFrame containing a player's ranking history,
-                    with columns 'ranking_date' and 'rank'
+        dates: Sorted datetime64 array of the player's ranking dates
+        ranks: Rank values aligned with dates
         target_date: The date for which to interpolate the rank
     
     Returns:
         float: The interpolated rank value at the target date
     """
-    # Convert to pandas for now as this function is more complex to rewrite
-    # and is called per tournament marker, not in bulk processing
-    pdf = player_data.to_pandas()
-    
-    # Convert polars.Date to pandas Timestamp via string
-    target_date_pd = pd.Timestamp(str(target_date))
+    # Compare in the resolution of the dates
+    target = np.datetime64(target_date).astype(dates.dtype)
     
     # If target_date is before the first ranking date, return the first rank
-    if target_date_pd <= pdf['ranking_date'].iloc[0]:
-        return float(pdf['rank'].iloc[0])
+    if target <= dates[0]:
+        return float(ranks[0])
     
     # If target_date is after the last ranking date, return the last rank
-    if target_date_pd >= pdf['ranking_date'].iloc[-1]:
-        return float(pdf['rank'].iloc[-1])
+    if target >= dates[-1]:
+        return float(ranks[-1])
     
     # Find the two ranking dates surrounding the target_date
-    before = pdf[pdf['ranking_date'] <= target_date_pd].iloc[-1]
-    after = pdf[pdf['ranking_date'] > target_date_pd].iloc[0]
+    i = np.searchsorted(dates, target, side='right')
+    before_date, before_rank = dates[i - 1], ranks[i - 1]
+    after_date, after_rank = dates[i], ranks[i]
     
     # Linear interpolation
-    total_days = (after['ranking_date'] - before['ranking_date']).days
+    total_days = (after_date - before_date) // np.timedelta64(1, 'D')
     if total_days == 0:
-        return float(before['rank'])  # Same date, no interpolation needed
+        return float(before_rank)  # Same date, no interpolation needed
     
     # Calculate proportion of time elapsed and apply to rank difference
-    days_since_before = (target_date_pd - before['ranking_date']).days
-    rank_diff = after['rank'] - before['rank']
-    interpolated_rank = before['rank'] + (rank_diff * days_since_before / total_days)
+    days_since_before = (target - before_date) // np.timedelta64(1, 'D')
+    rank_diff = after_rank - before_rank
+    interpolated_rank = before_rank + (rank_diff * days_since_before / total_days)
     
-    return float(interpolated_rank)
\ No newline at end of file
+    return float(interpolated_rank)
@@ -0,0 +1,30 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def atomic_write_path(path: str) -> Iterator[str]:
+    """
+    Yield a temporary path to write to, and atomically move it to path on success.
+
+    The temporary file lives in the same directory (so os.replace is a rename on the same
+    filesystem) and is dot-prefixed, so the raw file globs never pick it up. If the write
+    fails, or the process dies mid-write, path keeps its previous content; concurrent
+    writers never expose a partial file, the last one to finish wins.
+
+    Args:
+        path: Final destination of the file
+
+    Yields:
+        str: Temporary path to write the file to
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional
+from src.file_io import atomic_write_path
+
+
+def create_session(pool_maxsize: int = 20) -> requests.Session:
+    """
+    Create a requests session with connection pooling, keep-alive and retries.
+    
+    Reusing one session across scraper calls keeps TCP/TLS connections to the
+    ATP website open instead of performing a new handshake for every request.
+    
+    Args:
+        pool_maxsize: Maximum number of pooled connections per host
+                      (should be at least the number of concurrent workers)
+    
+    Returns:
+        requests.Session: Session with the default User-Agent header set
+    """
+    session = requests.Session()
+    session.headers.update({"User-Agent": "Mozilla/5.0"})
+    
+    # Retry transient failures with exponential backoff
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    
+    return session
+
+
+# Shared session used by all scrapers
+SESSION = create_session()
+
+# Seconds to wait for the server before giving up on a request (requests has no default timeout)
+REQUEST_TIMEOUT = 15
+
+
+class RateLimiter:
+    """
+    Space out requests by at least min_interval seconds, globally across threads.
+    
+    Each call to wait() reserves the next free slot under a lock and then sleeps
+    outside the lock until that slot, so politeness is independent of concurrency.
+    """
+    
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self) -> None:
+        """Block until the caller may issue its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def conditional_get(url: str, meta_path: Optional[str] = None) -> Optional[requests.Response]:
+    """
+    GET a URL, revalidating against the ETag/Last-Modified validators stored in meta_path.
+    
+    Without meta_path this is a plain GET. With it, the request carries the stored validators,
+    so an unchanged page is answered with 304 and not downloaded again; callers store the new
+    validators with save_validators once the response has been processed.
+    
+    Args:
+        url: URL to request
+        meta_path: Optional JSON sidecar file holding the validators from a previous response
+    
+    Returns:
+        requests.Response: The response, or None if the server answered 304 Not Modified
+    
+    Raises:
+        requests.exceptions.HTTPError: If the request fails
+    """
+    headers = {}
+    if meta_path is not None and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    
+    response = SESSION.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    
+    return response
+
+
+def save_validators(response: requests.Response, meta_path: Optional[str]) -> None:
+    """
+    Store a response's ETag/Last-Modified validators for later conditional requests.
+    
+    Args:
+        response: Response whose headers to store
+        meta_path: JSON sidecar file to write (nothing is stored if None)
+    """
+    if meta_path is None:
+        return
+    
+    meta = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    if not any(meta.values()):
+        return
+    
+    os.makedirs(os.path.dirname(meta_path) or ".", exist_ok=True)
+    with atomic_write_path(meta_path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+
+
+def discard_stale_validators(meta_path: str, data_path: str) -> None:
+    """
+    Remove the validators in meta_path if the data they describe is not on disk.
+    
+    Otherwise a conditional request could be answered with 304 for data that was never
+    saved (or was deleted), and the page would never be fetched again.
+    
+    Args:
+        meta_path: JSON sidecar file holding the validators
+        data_path: File the validators' response was saved to
+    """
+    if not os.path.exists(data_path) and os.path.exists(meta_path):
+        os.remove(meta_path)
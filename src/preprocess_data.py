@@ -1,63 +1,119 @@
+import ast
 import polars as pl
-import pandas as pd
-import numpy as np
 import os
 import glob
-import re
-from typing import Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from src.file_io import atomic_write_path
 
 
-def extract_dob(value: Any) -> Optional[str]:
+# Date of birth patterns, tried in this order: (YYYY/MM/DD) or (YYYY-MM-DD),
+# YYYY/MM/DD or YYYY-MM-DD, and DD.MM.YYYY (compiled and cached by Polars' regex engine)
+DMY_PATTERN = r'(\d{1,2}\.\d{1,2}\.\d{4})'
+DOB_PATTERNS = (
+    r'\((\d{4}[/-]\d{1,2}[/-]\d{1,2})\)',
+    r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',
+    DMY_PATTERN,
+)
+DMY_REORDER = r'(\d+)\.(\d+)\.(\d+)'
+
+# Columns read from the raw ranking files, all as strings in CSV dumps (Rank may contain 'T' for ties)
+RAW_RANKING_SCHEMA = {"ranking_date": pl.Utf8, "Rank": pl.Utf8, "atp_id": pl.Utf8, "atp_name": pl.Utf8}
+
+
+def scan_raw_rankings(path: str) -> pl.LazyFrame:
+    """
+    Lazily scan a raw rankings file into a common schema.
+    
+    Raw rankings are stored as Parquet; legacy CSV dumps are still accepted.
+    
+    Args:
+        path: Path to a raw rankings file (.parquet or .csv)
+    
+    Returns:
+        pl.LazyFrame: Columns 'ranking_date' (datetime), 'Rank', 'atp_id' and 'atp_name' (strings)
     """
-    Extract date of birth from various text formats.
+    if path.endswith(".parquet"):
+        lf = pl.scan_parquet(path).select(list(RAW_RANKING_SCHEMA))
+    else:
+        lf = (
+            pl.scan_csv(path, schema_overrides=RAW_RANKING_SCHEMA)  # Read Rank as string initially
+            .select(list(RAW_RANKING_SCHEMA))
+            .with_columns(pl.col("ranking_date").str.to_datetime("%Y-%m-%d"))  # Known format, no inference
+        )
+    
+    return lf.with_columns(
+        pl.col("ranking_date").cast(pl.Datetime(time_unit="us")),
+        pl.col("Rank").cast(pl.Utf8),
+        pl.col("atp_id").cast(pl.Utf8),
+        pl.col("atp_name").cast(pl.Utf8)
+    )
+
+
+def read_raw_tournaments(path: str) -> pl.DataFrame:
+    """
+    Read a raw tournaments file in the representation used by the tournaments preprocessing.
+    
+    Raw tournaments are stored as Parquet, with winner names/URLs as native list columns;
+    legacy CSV dumps are still accepted and their stringified lists are parsed back into
+    lists here, once, so the app never has to. Dates are returned as ISO strings.
+    
+    Args:
+        path: Path to a raw tournaments file (.parquet or .csv)
+    
+    Returns:
+        pl.DataFrame: Raw tournament data
+    """
+    if not path.endswith(".parquet"):
+        df = pl.read_csv(path)
+        return df.with_columns(
+            pl.col(col).map_elements(
+                lambda x: ast.literal_eval(x) if x.startswith('[') else [x],
+                return_dtype=pl.List(pl.Utf8)
+            )
+            for col, dtype in df.schema.items()
+            if dtype == pl.Utf8 and col.endswith(('_names', '_urls'))
+        )
+    
+    df = pl.read_parquet(path)
+    return df.with_columns(
+        pl.col(col).cast(pl.Utf8)
+        for col, dtype in df.schema.items() if dtype == pl.Date
+    )
+
+
+def extract_dob(values: pl.Expr) -> pl.Expr:
+    """
+    Build an expression extracting dates of birth from text in various formats.
     Handles formats like:
     - "37 (1987/05/22)"
     - "(1987/05/22)"
     - "1987/05/22"
     - "1987-05-22"
     - "22.05.1987"
+    
+    Each pattern is applied to the whole column by Polars' regex engine; patterns are
+    tried in order, and a later one only fills rows where the earlier ones found no valid date.
 
     Args:
-        value: The string or value to extract date from
+        values: Expression of strings to extract dates from
     
     Returns:
-        pl.Date or None: Extracted date or None if no valid date found
+        pl.Expr: Extracted dates as pl.Date (null where no valid date was found)
     """
-    if value is None or pd.isna(value):
-        return None
+    candidates = []
+    for pattern in DOB_PATTERNS:
+        date_str = values.str.extract(pattern, 1)
+        if pattern == DMY_PATTERN:
+            # DD.MM.YYYY -> YYYY-MM-DD
+            date_str = date_str.str.replace(DMY_REORDER, "${3}-${2}-${1}")
+        else:
+            # Standardize separator to '-'
+            date_str = date_str.str.replace_all("/", "-", literal=True)
         
-    if not isinstance(value, str):
-        return None
-    
-    # Try different regex patterns for date extraction
-    patterns = [
-        r'\((\d{4}[/-]\d{1,2}[/-]\d{1,2})\)',  # (YYYY/MM/DD) or (YYYY-MM-DD)
-        r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',      # YYYY/MM/DD or YYYY-MM-DD
-        r'(\d{1,2}\.\d{1,2}\.\d{4})',          # DD.MM.YYYY
-    ]
+        # Invalid dates become null, so the next pattern gets a chance at those rows
+        candidates.append(date_str.str.to_date("%Y-%m-%d", strict=False))
     
-    for pattern in patterns:
-        match = re.search(pattern, value)
-        if match:
-            date_str = match.group(1)
-            try:
-                # Handle different date formats
-                if '.' in date_str:  # DD.MM.YYYY
-                    parts = date_str.split('.')
-                    date_str = f"{parts[2]}-{parts[1]}-{parts[0]}"
-                else:
-                    # Standardize separator to '-'
-                    date_str = date_str.replace('/', '-')
-                
-                # Validate by parsing with pandas
-                pd_date = pd.to_datetime(date_str)
-                # Return as string in YYYY-MM-DD format
-                return pd_date.strftime('%Y-%m-%d')
-            except:
-                # If this format fails, try the next pattern
-                continue
-    
-    return None
+    return pl.coalesce(candidates)
 
 
 def insert_nan_for_gaps(rankings_df: pl.DataFrame, max_gap_days: int) -> pl.DataFrame:
@@ -76,69 +132,40 @@ def insert_nan_for_gaps(rankings_df: pl.DataFrame, max_gap_days: int) -> pl.Data
     """
     # Sort by atp_id and ranking_date once
     rankings_df = rankings_df.sort(["atp_id", "ranking_date"])
-
-    # Convert to pandas once for faster group operations
-    pdf = rankings_df.to_pandas()
-
-    new_rows = []
-
-    # Group by atp_id - much faster than filtering repeatedly
-    for atp_id, group in pdf.groupby("atp_id", sort=False):
-        dates = group["ranking_date"].values
-
-        # Get atp_name if it exists
-        atp_name = group["atp_name"].iloc[0] if "atp_name" in group.columns else None
-        
-        # Check for gaps between consecutive ranking dates
-        for i in range(1, len(dates)):
-            # Calculate gap in days
-            gap = (dates[i] - dates[i-1]) / np.timedelta64(1, 'D')
-            
-            if gap > max_gap_days:
-                # Insert a NaN row at midpoint of the gap
-                mid_date = dates[i-1] + (dates[i] - dates[i-1]) / 2
-                new_rows.append({
-                    "atp_id": atp_id,
-                    "atp_name": atp_name,
-                    "ranking_date": pd.Timestamp(mid_date),
-                    "rank": None
-                })
+    date_dtype = rankings_df.schema["ranking_date"]
     
-    # Add the new rows to the original DataFrame if any were created
-    if new_rows:
-        # Create a DataFrame from new rows
-        nan_df = pl.DataFrame(new_rows)
-        
-        # Ensure all columns from original DataFrame are present
-        for col in rankings_df.columns:
-            if col not in ["atp_id", "atp_name", "ranking_date", "rank"]:
-                nan_df = nan_df.with_columns(pl.lit(None).alias(col))
-        
-        # Ensure ranking_date has the correct type
-        dtype_map = {col: rankings_df.schema[col] for col in rankings_df.columns}
-        
-        # Convert columns to match the original DataFrame's schema
-        for col, dtype in dtype_map.items():
-            if col in nan_df.columns:
-                # For datetime columns, need special handling
-                if str(dtype).startswith("Datetime"):
-                    nan_df = nan_df.with_columns(
-                        pl.col(col).cast(pl.Datetime(time_unit="us"))
-                    )
-        
-        # Get the column order from the original DataFrame
-        column_order = rankings_df.columns
-        
-        # Ensure nan_df has the same column order
-        nan_df = nan_df.select(column_order)
-        
-        # Combine original data with new NaN rows and sort
-        combined = pl.concat([rankings_df, nan_df], how="vertical_relaxed")
-        combined = combined.sort(["atp_id", "ranking_date"])
-        
-        return combined
-    else:
+    # Previous ranking date of the same player, computed for all players in one vectorized pass
+    gaps = rankings_df.select(
+        pl.col("atp_id"),
+        (pl.col("atp_name").first().over("atp_id") if "atp_name" in rankings_df.columns
+         else pl.lit(None, dtype=pl.Utf8)).alias("atp_name"),
+        pl.col("ranking_date").shift(1).over("atp_id").alias("prev_date"),
+        pl.col("ranking_date"),
+    ).filter(
+        (pl.col("ranking_date") - pl.col("prev_date")) > pl.duration(days=max_gap_days)
+    )
+    
+    if gaps.is_empty():
         return rankings_df
+    
+    # One NaN row at the midpoint of each gap (integer microseconds, so no float rounding);
+    # all other columns are null, with the original DataFrame's types and column order
+    midpoint = (
+        (pl.col("prev_date").dt.epoch("us") + pl.col("ranking_date").dt.epoch("us")) // 2
+    )
+    nan_df = gaps.select(
+        pl.col("atp_id"),
+        pl.col("atp_name"),
+        pl.from_epoch(midpoint, time_unit="us").cast(date_dtype).alias("ranking_date"),
+    ).select(
+        pl.col(col) if col in ("atp_id", "atp_name", "ranking_date")
+        else pl.lit(None, dtype=dtype).alias(col)
+        for col, dtype in rankings_df.schema.items()
+    )
+    
+    # Combine original data with new NaN rows and sort
+    combined = pl.concat([rankings_df, nan_df], how="vertical_relaxed")
+    return combined.sort(["atp_id", "ranking_date"])
 
 
 def preprocess_all(max_gap_days: int = 180) -> None:
@@ -158,122 +185,111 @@ def preprocess_all(max_gap_days: int = 180) -> None:
         None: Files are saved to disk in the data/ directory
     """
     # --- RANKINGS PREPROCESSING ---
-    ranking_files = glob.glob("data/raw/rankings/*/atp_rankings_*_raw.csv")
+    ranking_files = glob.glob("data/raw/rankings/*/atp_rankings_*_raw.*")
     rankings_out_path = "data/atp_rankings.parquet"
     
     if ranking_files:
-        # Read all CSV files with schema override for the Rank column
-        rankings_list = [
-            pl.read_csv(
-                f,
-                schema_overrides={"Rank": pl.Utf8},  # Read Rank as string initially
-                infer_schema_length=10000
-            ) 
-            for f in ranking_files
-        ]
-        rankings = pl.concat(rankings_list, how="vertical_relaxed")
-
-        # Ensure column names are consistent (rename 'Rank' to 'rank' if needed)
-        if 'Rank' in rankings.columns and 'rank' not in rankings.columns:
-            rankings = rankings.rename({"Rank": "rank"})
-        
-        # Keep only necessary columns
-        keep_cols = [c for c in ['ranking_date', 'rank', 'atp_id', 'atp_name'] if c in rankings.columns]
-        rankings = rankings.select(keep_cols).unique()
-        
-        # Convert ranking_date to datetime
-        rankings = rankings.with_columns(
-            pl.col("ranking_date").str.to_datetime()
-        )
-
-        # Clean rank values by removing 'T' for tied ranks and convert to Int16
-        if 'rank' in rankings.columns:
-            rankings = rankings.with_columns(
+        # Lazily scan each file with only the needed columns; Polars pushes the
+        # projection into the readers and runs the scans in parallel. The streaming
+        # engine processes the files in batches instead of materializing them all first
+        rankings = (
+            pl.concat([scan_raw_rankings(f) for f in ranking_files], how="vertical")
+            .rename({"Rank": "rank"})
+            # Dedup, grouping and sorting on the player columns then hash/compare
+            # integer category codes instead of strings
+            .with_columns(
+                pl.col("atp_id").cast(pl.Categorical),
+                pl.col("atp_name").cast(pl.Categorical)
+            )
+            .unique()
+            # Clean rank values by removing 'T' for tied ranks and convert to Int16
+            .with_columns(
                 pl.col("rank").str.replace("T", "").cast(pl.Int16)
             )
+            .collect(engine="streaming")
+        )
         
         # Insert NaN for gaps greater than max_gap_days
         rankings = insert_nan_for_gaps(rankings, max_gap_days)
         
-        # Save processed rankings data
-        rankings.write_parquet(rankings_out_path, compression="snappy")
+        # The app works on the player columns as plain strings
+        rankings = rankings.with_columns(
+            pl.col("atp_id").cast(pl.Utf8),
+            pl.col("atp_name").cast(pl.Utf8)
+        )
+        
+        # Save processed rankings data (grouped by atp_id and sorted by ranking_date, which
+        # keeps the id and date runs compact for dictionary/RLE encoding under zstd). Smaller
+        # row groups with min/max statistics let filtered reads skip most of the file
+        with atomic_write_path(rankings_out_path) as tmp_path:
+            rankings.write_parquet(tmp_path, compression="zstd", compression_level=3,
+                                   row_group_size=100_000, statistics=True)
 
     # --- TOURNAMENTS PREPROCESSING ---
-    tournament_files = glob.glob("data/raw/tournaments/*/tournaments_*_raw.csv")
+    tournament_files = glob.glob("data/raw/tournaments/*/tournaments_*_raw.*")
     tournaments_out_path = "data/atp_tournaments.parquet"
     
     if tournament_files:
-        # Read all CSV files in parallel
-        tournaments_list = [pl.read_csv(f) for f in tournament_files]
+        # One small file per year and type; the Polars readers release the GIL,
+        # so reading them in threads overlaps the per-file open/decode overhead
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tournaments_list = list(executor.map(read_raw_tournaments, tournament_files))
 
         # Use diagonal concatenation to handle different column sets
-        tournaments = pl.concat(tournaments_list, how="diagonal")
+        tournaments = pl.concat(tournaments_list, how="diagonal_relaxed")
         
         # Keep only necessary columns
         keep_cols = [c for c in ['tournament_name', 'start_date', 'end_date', 'tournament_type',
                                 'singles_winner_names', 'singles_winner_urls', 'venue'] if c in tournaments.columns]
-        tournaments = tournaments.select(keep_cols)
-
-        # For deduplication, convert to pandas temporarily
-        # This is because handling lists in deduplication is complex
-        pd_tournaments = tournaments.to_pandas()
-
-        # Convert unhashable types (like lists) to hashable types before deduplication
-        pd_tournaments_for_dedup = pd_tournaments.copy()
-        for col in pd_tournaments_for_dedup.columns:
-            if pd_tournaments_for_dedup[col].apply(lambda x: isinstance(x, (list, np.ndarray)) if not pd.isna(x) else False).any():
-                pd_tournaments_for_dedup[col] = pd_tournaments_for_dedup[col].apply(
-                    lambda x: tuple(x) if isinstance(x, (list, np.ndarray)) else x
-                )
-
-        # Get unique indices and use them to filter the original dataframe
-        unique_indices = pd_tournaments_for_dedup.drop_duplicates().index
-        pd_tournaments = pd_tournaments.iloc[unique_indices]
         
-        # Convert back to polars
-        tournaments = pl.from_pandas(pd_tournaments)
-        
-        # Convert date columns to datetime
-        for date_col in ['start_date', 'end_date']:
-            if date_col in tournaments.columns:
-                tournaments = tournaments.with_columns(
-                    pl.col(date_col).str.to_datetime()
-                )
+        # Deduplicate and convert date columns to dates in one lazy query; unique() hashes
+        # the list columns natively, so no pandas round trip with tuple conversion is needed.
+        # The ISO format is known, so it is given explicitly instead of being inferred
+        tournaments = (
+            tournaments.lazy()
+            .select(keep_cols)
+            .unique(maintain_order=True)
+            .with_columns(
+                pl.col(date_col).str.to_date("%Y-%m-%d", strict=False)
+                for date_col in ['start_date', 'end_date'] if date_col in keep_cols
+            )
+            .collect()
+        )
         
         # Save processed tournament data
-        tournaments.write_parquet(tournaments_out_path, compression="snappy")
+        with atomic_write_path(tournaments_out_path) as tmp_path:
+            tournaments.write_parquet(tmp_path, compression="zstd", compression_level=3)
 
     # --- PLAYERS PREPROCESSING ---
     players_raw_path = "data/raw/players/players_raw.parquet"
     players_out_path = "data/atp_players.parquet"
     
     if os.path.exists(players_raw_path):
-        # Load raw player data
-        players = pl.read_parquet(players_raw_path)
-        
-        # Create a pandas DataFrame for easier processing
-        pd_players = players.to_pandas()
+        # Load only the raw player columns used below (the raw file also holds
+        # biography and social media fields)
+        players_lf = pl.scan_parquet(players_raw_path)
+        raw_columns = players_lf.collect_schema().names()
+        players = players_lf.select(
+            c for c in ['atp_id', 'atp_name', 'full_name', 'dob', 'age', 'country_code'] if c in raw_columns
+        ).collect()
         
-        # Process DOB from both dob and age columns
-        if 'dob' in pd_players.columns:
-            # First, convert any existing DOB strings to proper date format
-            # Only process rows where dob is not null and is a string
-            mask_dob = (~pd_players['dob'].isna()) & (pd_players['dob'].apply(lambda x: isinstance(x, str)))
-            pd_players.loc[mask_dob, 'dob'] = pd_players.loc[mask_dob, 'dob'].apply(
-                lambda x: pd.to_datetime(x.replace('/', '-')) if isinstance(x, str) else x
+        # Process DOB from both dob and age columns, as native Polars expressions
+        if 'dob' in players.columns and players.schema['dob'] == pl.Utf8:
+            # First, convert any existing DOB strings to proper date format,
+            # normalizing separators (unparseable strings become null)
+            players = players.with_columns(
+                pl.col("dob").str.replace_all("/", "-", literal=True).str.to_date("%Y-%m-%d", strict=False)
             )
         
         # Then try to extract DOB from age column where dob is missing
-        if 'age' in pd_players.columns:
-            mask_age = pd_players['dob'].isna() & (~pd_players['age'].isna())
-            pd_players.loc[mask_age, 'dob'] = pd_players.loc[mask_age, 'age'].apply(extract_dob)
-            # Convert extracted string dates to datetime
-            pd_players.loc[mask_age, 'dob'] = pd.to_datetime(pd_players.loc[mask_age, 'dob'], errors='coerce')
-        
-        # Convert back to polars
-        players = pl.from_pandas(pd_players)
+        if 'age' in players.columns:
+            age_dob = extract_dob(pl.col("age").cast(pl.Utf8))
+            players = players.with_columns(
+                (pl.coalesce(pl.col("dob").cast(pl.Date), age_dob) if 'dob' in players.columns else age_dob)
+                .alias("dob")
+            )
         
-        # Convert datetime column to Polars Date type
+        # Ensure the date column has the Polars Date type
         if 'dob' in players.columns:
             players = players.with_columns(
                 pl.col("dob").cast(pl.Date)
@@ -284,4 +300,5 @@ def preprocess_all(max_gap_days: int = 180) -> None:
         players = players.select(keep_cols).unique()
         
         # Save processed player data
-        players.write_parquet(players_out_path, compression="snappy")
\ No newline at end of file
+        with atomic_write_path(players_out_path) as tmp_path:
+            players.write_parquet(tmp_path, compression="zstd", compression_level=3)
\ No newline at end of file